@@ -0,0 +1,265 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+import pygame
+
+from constants import (
+    ASSET_BUNDLE_PATH, NORMAL_TANK_SIZE, TANK_TYPE_BLUE, TILE_SIZE,
+    NORMAL_VERTICAL_BULLET_SIZE, NORMAL_HORIZONTAL_BULLET_SIZE,
+)
+
+BUNDLE_MAGIC = b"TNKBNDL1"
+BUNDLE_ALIGNMENT = 16
+
+def asset_key(name, size, image_cat, image_type):
+    """
+    Build the bundle key of a scaled asset.
+
+    Args:
+        name (str): The name of the image file.
+        size (tuple): The size to which the image is scaled.
+        image_cat (str): The category of the image (e.g., "tilesets").
+        image_type (str): The type of the image (e.g., "terrain").
+
+    Returns:
+        str: The key of the asset in the bundle index.
+    """
+    return f"{image_cat}/{image_type}/{name}@{size[0]}x{size[1]}"
+
+def referenced_assets():
+    """
+    List every asset the game loads, with the size it is scaled to.
+
+    Returns:
+        list: (name, size, image_cat, image_type) tuples, as passed to helpers.load_png.
+    """
+    from helpers import TILE_IMAGE_MAPPING, OBJECT_IMAGE_MAPPING
+
+    assets = []
+    for direction in ("up", "down", "left", "right"):
+        assets.append((f"{TANK_TYPE_BLUE}_{direction}.png", NORMAL_TANK_SIZE, "tanks", TANK_TYPE_BLUE))
+    for direction, size in (
+        ("up", NORMAL_VERTICAL_BULLET_SIZE), ("down", NORMAL_VERTICAL_BULLET_SIZE),
+        ("left", NORMAL_HORIZONTAL_BULLET_SIZE), ("right", NORMAL_HORIZONTAL_BULLET_SIZE),
+    ):
+        assets.append((f"shotThin_{direction}.png", size, "bullets", "shotThin"))
+    for num in range(5):
+        for size in ((15, 15), NORMAL_TANK_SIZE):
+            assets.append((f"explosion{num + 1}.png", size, "explosion", "simple_explosion"))
+    for name in TILE_IMAGE_MAPPING.values():
+        assets.append((name, (TILE_SIZE, TILE_SIZE), "tilesets", "terrain"))
+    for name, size in OBJECT_IMAGE_MAPPING.values():
+        assets.append((name, size, "tilesets", "objects"))
+    return assets
+
+def source_hash(path, size):
+    """
+    Hash a source image together with its target size.
+
+    Args:
+        path (str): The path of the source image.
+        size (tuple): The size to which the image is scaled.
+
+    Returns:
+        str: The hex digest identifying this version of the scaled asset.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        digest.update(source.read())
+    digest.update(struct.pack("<2I", *size))
+    return digest.hexdigest()
+
+def build_bundle(path=ASSET_BUNDLE_PATH, assets=None, force=False):
+    """
+    Pre-scale every referenced asset and write it to a single bundle file.
+
+    The file holds a magic number, the length of a JSON index, the index
+    itself, and then the raw pixel data of every asset, each entry aligned
+    to BUNDLE_ALIGNMENT bytes. The build is skipped when the existing
+    bundle already matches the content hash of every source.
+
+    Args:
+        path (str): The path of the bundle file to write.
+        assets (list): The assets to include; defaults to referenced_assets().
+        force (bool): Rebuild even if the bundle is up to date.
+
+    Returns:
+        bool: True if the bundle was written, False if it was already up to date.
+    """
+    if assets is None:
+        assets = referenced_assets()
+
+    hashes = {}
+    for name, size, image_cat, image_type in assets:
+        source = os.path.join("assets", image_cat, image_type, name)
+        hashes[asset_key(name, size, image_cat, image_type)] = (source, source_hash(source, size))
+
+    if not force and os.path.exists(path):
+        try:
+            with AssetBundle(path) as bundle:
+                current = {key: entry["hash"] for key, entry in bundle.index.items()}
+            if current == {key: digest for key, (_, digest) in hashes.items()}:
+                return False
+        except ValueError:
+            pass
+
+    index = {}
+    blobs = []
+    offset = 0
+    for name, size, image_cat, image_type in assets:
+        key = asset_key(name, size, image_cat, image_type)
+        source, digest = hashes[key]
+        image = pygame.transform.scale(pygame.image.load(source), size)
+        pixel_format = "RGBA" if image.get_flags() & pygame.SRCALPHA else "RGB"
+        data = pygame.image.tobytes(image, pixel_format)
+        padding = -len(data) % BUNDLE_ALIGNMENT
+        stat = os.stat(source)
+        index[key] = {
+            "size": list(size),
+            "format": pixel_format,
+            "offset": offset,
+            "length": len(data),
+            "source": source,
+            "hash": digest,
+            "source_size": stat.st_size,
+            "source_mtime": stat.st_mtime_ns,
+        }
+        blobs.append(data + bytes(padding))
+        offset += len(data) + padding
+
+    header = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    header += b" " * (-(len(BUNDLE_MAGIC) + 4 + len(header)) % BUNDLE_ALIGNMENT)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as bundle_file:
+        bundle_file.write(BUNDLE_MAGIC)
+        bundle_file.write(struct.pack("<I", len(header)))
+        bundle_file.write(header)
+        for blob in blobs:
+            bundle_file.write(blob)
+    os.replace(temporary, path)
+    return True
+
+class AssetBundle():
+    """
+    A class giving access to a memory-mapped asset bundle.
+
+    Surfaces are built directly on top of the mapped file with
+    pygame.image.frombuffer, so loading an asset neither decodes a PNG nor
+    rescales it. The file is mapped copy-on-write, so drawing on a loaded
+    surface changes a private copy of its pages and never the file. The
+    bundle must stay open while its surfaces are in use.
+
+    Attributes:
+        path (str): The path of the bundle file.
+        index (dict): The bundle index, keyed by asset_key().
+
+    Methods:
+        load(name, size, image_cat, image_type):
+            Get an asset from the bundle as a surface, or None if it is missing.
+
+        stale_entries():
+            Get the keys whose source image changed since the bundle was built.
+
+        close():
+            Unmap and close the bundle file.
+    """
+
+    def __init__(self, path=ASSET_BUNDLE_PATH):
+        """
+        Initialize an AssetBundle object by mapping the bundle file.
+
+        Args:
+            path (str): The path of the bundle file.
+
+        Raises:
+            ValueError: If the file is not an asset bundle.
+        """
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_COPY)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"Empty asset bundle: {path}")
+        if self.map[:len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+            self.close()
+            raise ValueError(f"Not an asset bundle: {path}")
+        header_start = len(BUNDLE_MAGIC) + 4
+        (header_length,) = struct.unpack_from("<I", self.map, len(BUNDLE_MAGIC))
+        self.index = json.loads(self.map[header_start:header_start + header_length])
+        self.data_start = header_start + header_length
+        self.buffer = memoryview(self.map)
+
+    def load(self, name, size, image_cat, image_type):
+        """
+        Get an asset from the bundle as a surface, or None if it is missing.
+
+        Args:
+            name (str): The name of the image file.
+            size (tuple): The size to which the image was scaled.
+            image_cat (str): The category of the image (e.g., "tilesets").
+            image_type (str): The type of the image (e.g., "terrain").
+
+        Returns:
+            pygame.Surface: A surface sharing memory with the bundle, or None.
+        """
+        entry = self.index.get(asset_key(name, size, image_cat, image_type))
+        if entry is None:
+            return None
+        start = self.data_start + entry["offset"]
+        return pygame.image.frombuffer(self.buffer[start:start + entry["length"]], tuple(entry["size"]), entry["format"])
+
+    def stale_entries(self):
+        """
+        Get the keys whose source image changed since the bundle was built.
+
+        A source whose size and modification time match the ones recorded at
+        build time is taken as unchanged; any other source is hashed.
+
+        Returns:
+            list: The keys of entries whose source is missing or whose content hash no longer matches.
+        """
+        stale = []
+        for key, entry in self.index.items():
+            source = entry["source"]
+            try:
+                stat = os.stat(source)
+            except OSError:
+                stale.append(key)
+                continue
+            if "source_size" in entry and stat.st_size != entry["source_size"]:
+                stale.append(key)
+            elif (stat.st_size, stat.st_mtime_ns) != (entry.get("source_size"), entry.get("source_mtime")):
+                if source_hash(source, entry["size"]) != entry["hash"]:
+                    stale.append(key)
+        return stale
+
+    def close(self):
+        """
+        Unmap and close the bundle file.
+        """
+        if getattr(self, "buffer", None) is not None:
+            self.buffer.release()
+            self.buffer = None
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    written = build_bundle(force="--force" in sys.argv)
+    elapsed = time.perf_counter() - start
+    if written:
+        print(f"Wrote {ASSET_BUNDLE_PATH} ({os.path.getsize(ASSET_BUNDLE_PATH)} bytes) in {elapsed * 1000:.1f} ms")
+    else:
+        print(f"{ASSET_BUNDLE_PATH} is up to date")
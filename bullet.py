@@ -1,6 +1,24 @@
 import pygame
 from helpers import load_png
-from constants import NORMAL_VERTICAL_BULLET_SIZE, NORMAL_HORIZONTAL_BULLET_SIZE
+from constants import NORMAL_VERTICAL_BULLET_SIZE, NORMAL_HORIZONTAL_BULLET_SIZE, BULLET_SPEED
+
+def load_bullet_images(bullet_type="shotThin"):
+    """
+    Load the bullet images for every direction.
+
+    Args:
+        bullet_type (str): The type of bullet (e.g., "shotThin").
+
+    Returns:
+        dict: A mapping of direction to an (image, rect) tuple.
+    """
+    category = "bullets"
+    return {
+        "up": load_png(f"{bullet_type}_up.png", NORMAL_VERTICAL_BULLET_SIZE, category, bullet_type),
+        "down": load_png(f"{bullet_type}_down.png", NORMAL_VERTICAL_BULLET_SIZE, category, bullet_type),
+        "left": load_png(f"{bullet_type}_left.png", NORMAL_HORIZONTAL_BULLET_SIZE, category, bullet_type),
+        "right": load_png(f"{bullet_type}_right.png", NORMAL_HORIZONTAL_BULLET_SIZE, category, bullet_type),
+    }
 
 class Bullet(pygame.sprite.Sprite):
     """
@@ -10,16 +28,18 @@ class Bullet(pygame.sprite.Sprite):
         images (dict): Dictionary containing bullet images for different directions.
         image (pygame.Surface): The current bullet image.
         rect (pygame.Rect): The bullet's rectangular boundary.
-        speed (int): The bullet's movement speed.
+        pos (pygame.math.Vector2): The bullet's center position at the current tick.
+        prev_pos (pygame.math.Vector2): The bullet's center position at the previous tick.
+        speed (int): The bullet's movement speed in pixels per second.
         id (int): The identifier of the bullet.
         direction (str): The direction in which the bullet is moving.
 
     Methods:
-        draw(screen):
-            Draw the bullet on the screen.
+        draw(screen, alpha):
+            Draw the bullet on the screen, interpolated between the last two ticks.
 
-        update(screen):
-            Update the bullet's position and draw it on the screen.
+        update(dt):
+            Advance the bullet's position by one simulation tick.
     """
 
     def __init__(self, x, y, direction, id):
@@ -33,43 +53,44 @@ class Bullet(pygame.sprite.Sprite):
             id (int): The identifier of the bullet.
         """
         super().__init__()
-        bullet_type = "shotThin"
-        category = "bullets"
-        self.images = {
-            "up": load_png(f"{bullet_type}_up.png", NORMAL_VERTICAL_BULLET_SIZE, category, bullet_type),
-            "down": load_png(f"{bullet_type}_down.png", NORMAL_VERTICAL_BULLET_SIZE, category, bullet_type),
-            "left": load_png(f"{bullet_type}_left.png", NORMAL_HORIZONTAL_BULLET_SIZE, category, bullet_type),
-            "right": load_png(f"{bullet_type}_right.png", NORMAL_HORIZONTAL_BULLET_SIZE, category, bullet_type),
-        }
+        self.images = load_bullet_images()
         self.image, self.rect = self.images[direction]
         self.rect.center = (x, y)
-        self.speed = 5
+        self.pos = pygame.math.Vector2(x, y)
+        self.prev_pos = pygame.math.Vector2(x, y)
+        self.speed = BULLET_SPEED
         self.id = id
         self.direction = direction
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """
-        Draw the bullet on the screen.
+        Draw the bullet on the screen, interpolated between the last two ticks.
 
         Args:
             screen (pygame.Surface): The Pygame surface on which to draw the bullet.
+            alpha (float): How far the render time is between the previous and current tick.
         """
-        screen.blit(self.image, self.rect)
+        rect = self.rect.copy()
+        rect.center = self.prev_pos.lerp(self.pos, alpha)
+        screen.blit(self.image, rect)
 
-    def update(self, screen):
+    def update(self, dt):
         """
-        Update the bullet's position and draw it on the screen.
+        Advance the bullet's position by one simulation tick.
 
         Args:
-            screen (pygame.Surface): The Pygame surface on which to draw the bullet.
+            dt (float): The length of the simulation tick in seconds.
         """
+        self.prev_pos.update(self.pos)
+        distance = self.speed * dt
+
         if self.direction == "up":
-            self.rect.y -= self.speed
+            self.pos.y -= distance
         elif self.direction == "down":
-            self.rect.y += self.speed
+            self.pos.y += distance
         elif self.direction == "left":
-            self.rect.x -= self.speed
+            self.pos.x -= distance
         elif self.direction == "right":
-            self.rect.x += self.speed
+            self.pos.x += distance
 
-        self.draw(screen)
+        self.rect.center = (round(self.pos.x), round(self.pos.y))
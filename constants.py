@@ -3,8 +3,14 @@
 # screen setup
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 576
-FPS = 60
 TILE_SIZE = 64
+CHUNK_TILES = 4
+
+# pre-scaled asset bundle built by asset_bundle.py (PNG files are used if it is missing)
+ASSET_BUNDLE_PATH = "assets/bundle.bin"
+
+# map setup (None uses the hand-made map, an int seeds the procedural generator)
+MAP_SEED = None
 
 # tank values
 NORMAL_TANK_SIZE = (40,40)
@@ -17,4 +23,53 @@ RED = (255, 0, 0)
 
 # bullet values
 NORMAL_VERTICAL_BULLET_SIZE = (10, 20)
-NORMAL_HORIZONTAL_BULLET_SIZE = (20, 10)
\ No newline at end of file
+NORMAL_HORIZONTAL_BULLET_SIZE = (20, 10)
+BULLET_SPEED = 300
+BULLET_DAMAGE = 10
+
+# fog of war (FOG_VIEWER None shows what any player can see)
+FOG_OF_WAR = False
+FOG_VIEWER = None
+FOG_SIGHT_RADIUS = 5
+FOG_EXPLORED_ALPHA = 150
+FOG_UNSEEN_ALPHA = 235
+
+# explosion values
+EXPLOSION_FRAME_TIME = 8 / 60
+
+# simulation timing
+TICK_RATE = 60
+TICK_DT = 1 / TICK_RATE
+MAX_FRAME_TIME = 0.25
+MAX_TICKS_PER_FRAME = 5
+
+# rendering (0 leaves the frame rate uncapped)
+RENDER_FPS = 0
+VSYNC = False
+RENDERER = "software"  # "software" blits or "texture" for the SDL renderer
+WINDOW_SCALE = 1
+
+# gameplay capture (F9 starts and stops recording into a new directory under CAPTURE_DIR)
+CAPTURE_DIR = "captures"
+CAPTURE_FORMAT = "raw"  # "raw" for one file of 32-bit frames (bgr0/rgb0, see capture.json) or "png" for a PNG sequence
+CAPTURE_BUFFERS = 8
+
+# match telemetry (events are flushed to TELEMETRY_DIR every TELEMETRY_FLUSH_INTERVAL seconds, one file per match)
+TELEMETRY = False
+TELEMETRY_DIR = "telemetry"
+TELEMETRY_FORMAT = "binary"  # "binary" for packed records or "jsonl" for one JSON object per line
+TELEMETRY_BUFFER = 4096  # events
+TELEMETRY_FLUSH_INTERVAL = 1.0
+TELEMETRY_MAX_FILE_BYTES = 1 << 20
+
+# memory diagnostics (a report every MEMORY_SNAPSHOT_INTERVAL frames; budgets apply after MEMORY_WARMUP_FRAMES)
+MEMORY_DIAGNOSTICS = False
+MEMORY_SNAPSHOT_INTERVAL = 300
+MEMORY_WARMUP_FRAMES = 600
+MEMORY_FRAME_BUDGET = 64  # bytes retained per frame
+MEMORY_SURFACE_BUDGET = 2  # surfaces created per frame
+MEMORY_PEAK_BUDGET = 16384  # process-wide transient peak within one frame, in bytes
+MEMORY_TRACKED_FILES = (
+    "main.py", "menu.py", "bullet.py", "explosion.py", "health_bar.py",
+    "tank.py", "systems.py", "renderer.py", "environment.py", "fog_of_war.py", "helpers.py", "ecs.py",
+)
@@ -0,0 +1,223 @@
+import numpy as np
+
+# entity kinds
+KIND_NONE = 0
+KIND_TANK = 1
+KIND_BULLET = 2
+KIND_EXPLOSION = 3
+
+# component flags
+TRANSFORM = 1
+VELOCITY = 2
+HEALTH = 4
+OWNER = 8
+COOLDOWN = 16
+SPRITE = 32
+
+# direction indices stored in the transform component
+DIRECTIONS = ("up", "down", "left", "right")
+DIRECTION_INDEX = {direction: index for index, direction in enumerate(DIRECTIONS)}
+DIRECTION_VECTORS = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)], dtype=np.float32)
+
+# component name -> (flag, [(field, dtype), ...])
+COMPONENTS = {
+    "transform": (TRANSFORM, [("x", np.float32), ("y", np.float32), ("prev_x", np.float32), ("prev_y", np.float32), ("direction", np.uint8)]),
+    "velocity": (VELOCITY, [("vx", np.float32), ("vy", np.float32)]),
+    "health": (HEALTH, [("health", np.int16), ("max_health", np.int16)]),
+    "owner": (OWNER, [("owner", np.int8)]),
+    "cooldown": (COOLDOWN, [("cooldown", np.float32)]),
+    "sprite": (SPRITE, [("sprite", np.int16), ("frame", np.uint8), ("frame_time", np.float32), ("width", np.int16), ("height", np.int16)]),
+}
+
+class EntityStore():
+    """
+    A class storing game entities as contiguous, typed component arrays.
+
+    Every component field is a NumPy array indexed by entity id, so systems
+    can process all entities of a kind in bulk instead of looping over sprite
+    objects. Destroyed ids are recycled through a free list.
+
+    Attributes:
+        capacity (int): The number of entity slots currently allocated.
+        count (int): The high-water mark of entity ids in use.
+        alive (numpy.ndarray): Whether each entity slot is in use.
+        kind (numpy.ndarray): The kind of each entity (KIND_TANK, KIND_BULLET, ...).
+        mask (numpy.ndarray): The component flags of each entity.
+        sprites (list): Registered sprites, each a list of frame surfaces.
+        sprite_ids (dict): A mapping of sprite names to their ids.
+        sprite_frame_counts (numpy.ndarray): The number of frames of each registered sprite.
+
+    Methods:
+        create(kind, mask, **values):
+            Create an entity and return its id.
+
+        destroy(entity):
+            Destroy a single entity.
+
+        destroy_many(entities):
+            Destroy a batch of entities.
+
+        clear(kind):
+            Destroy every entity of a kind.
+
+        query(mask, kind):
+            Get the ids of live entities that have all the given components.
+
+        register_sprite(name, frames):
+            Register a list of frame surfaces and return the sprite id.
+
+        memory_report():
+            Get the memory used per entity by each component.
+    """
+
+    def __init__(self, capacity=256):
+        """
+        Initialize an EntityStore object.
+
+        Args:
+            capacity (int): The number of entity slots to allocate up front.
+        """
+        self.capacity = 0
+        self.count = 0
+        self.free = []
+        self.fields = {}
+        self.alive = np.zeros(0, dtype=np.bool_)
+        self.kind = np.zeros(0, dtype=np.uint8)
+        self.mask = np.zeros(0, dtype=np.uint8)
+        for _, fields in COMPONENTS.values():
+            for field, dtype in fields:
+                self.fields[field] = dtype
+                setattr(self, field, np.zeros(0, dtype=dtype))
+        self.sprites = []
+        self.sprite_ids = {}
+        self.sprite_frame_counts = np.zeros(0, dtype=np.uint8)
+        self.grow(capacity)
+
+    def grow(self, capacity):
+        """
+        Grow every component array to hold at least the given number of entities.
+
+        Args:
+            capacity (int): The new minimum number of entity slots.
+        """
+        capacity = max(capacity, self.capacity * 2, 1)
+        for name in ["alive", "kind", "mask"] + list(self.fields):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.capacity] = old
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def create(self, kind, mask, **values):
+        """
+        Create an entity and return its id.
+
+        Args:
+            kind (int): The kind of the entity.
+            mask (int): The component flags of the entity.
+            **values: Initial values for component fields, keyed by field name.
+
+        Returns:
+            int: The id of the new entity.
+        """
+        if self.free:
+            entity = self.free.pop()
+        else:
+            if self.count >= self.capacity:
+                self.grow(self.count + 1)
+            entity = self.count
+            self.count += 1
+
+        for field in self.fields:
+            getattr(self, field)[entity] = values.get(field, 0)
+        self.alive[entity] = True
+        self.kind[entity] = kind
+        self.mask[entity] = mask
+        return entity
+
+    def destroy(self, entity):
+        """
+        Destroy a single entity.
+
+        Args:
+            entity (int): The id of the entity to destroy.
+        """
+        if self.alive[entity]:
+            self.alive[entity] = False
+            self.kind[entity] = KIND_NONE
+            self.mask[entity] = 0
+            self.free.append(int(entity))
+
+    def destroy_many(self, entities):
+        """
+        Destroy a batch of entities.
+
+        Args:
+            entities (numpy.ndarray): The ids of the entities to destroy.
+        """
+        entities = np.unique(entities)
+        entities = entities[self.alive[entities]]
+        self.alive[entities] = False
+        self.kind[entities] = KIND_NONE
+        self.mask[entities] = 0
+        self.free.extend(entities.tolist())
+
+    def clear(self, kind):
+        """
+        Destroy every entity of a kind.
+
+        Args:
+            kind (int): The kind of entity to destroy.
+        """
+        self.destroy_many(self.query(0, kind))
+
+    def query(self, mask, kind=None):
+        """
+        Get the ids of live entities that have all the given components.
+
+        Args:
+            mask (int): The component flags every returned entity must have.
+            kind (int): If given, only entities of this kind are returned.
+
+        Returns:
+            numpy.ndarray: The matching entity ids in ascending order.
+        """
+        count = self.count
+        selected = self.alive[:count] & ((self.mask[:count] & mask) == mask)
+        if kind is not None:
+            selected &= self.kind[:count] == kind
+        return np.flatnonzero(selected)
+
+    def register_sprite(self, name, frames):
+        """
+        Register a list of frame surfaces and return the sprite id.
+
+        Registering a name twice returns the id of the first registration.
+
+        Args:
+            name (str): The name of the sprite.
+            frames (list): The frame surfaces of the sprite.
+
+        Returns:
+            int: The id of the sprite.
+        """
+        if name not in self.sprite_ids:
+            self.sprite_ids[name] = len(self.sprites)
+            self.sprites.append(list(frames))
+            self.sprite_frame_counts = np.append(self.sprite_frame_counts, len(frames)).astype(np.uint8)
+        return self.sprite_ids[name]
+
+    def memory_report(self):
+        """
+        Get the memory used per entity by each component.
+
+        Returns:
+            dict: Bytes per entity for each component and the bookkeeping arrays,
+            plus the "total" per entity and the "allocated" bytes for all slots.
+        """
+        report = {"bookkeeping": self.alive.itemsize + self.kind.itemsize + self.mask.itemsize}
+        for name, (_, fields) in COMPONENTS.items():
+            report[name] = sum(np.dtype(dtype).itemsize for _, dtype in fields)
+        report["total"] = sum(report.values())
+        report["allocated"] = report["total"] * self.capacity
+        return report
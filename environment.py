@@ -1,15 +1,32 @@
+import time
 import pygame
-from helpers import load_image, load_png
-from constants import SCREEN_HEIGHT, SCREEN_WIDTH, TILE_SIZE, NORMAL_TANK_SIZE
+import numpy as np
+from helpers import load_image, load_png, load_object, OBJECT_HEALTH
+from map_generator import MapGenerator
+from constants import SCREEN_HEIGHT, SCREEN_WIDTH, TILE_SIZE, CHUNK_TILES, NORMAL_TANK_SIZE
 
 class Environment():
     """
     A class representing the game environment and terrain in a Pygame-based game.
 
+    Terrain is drawn from baked chunk surfaces of CHUNK_TILES x CHUNK_TILES
+    tiles. Damaging an obstacle only marks its chunk dirty, and only dirty
+    chunks are re-baked the next time they are drawn.
+
     Attributes:
-        tilemap (list): A 2D list representing the tilemap of the game environment.
+        tilemap (list): A 2D list or array representing the tilemap of the game environment.
+        obstacles (numpy.ndarray): A 2D array of object IDs placed on the tilemap, or None.
+        initial_obstacles (numpy.ndarray): The obstacle layer as loaded, restored by reset_obstacles().
+        obstacle_health (numpy.ndarray): A 2D array of the hits each obstacle can still take.
+        craters (numpy.ndarray): A 2D boolean array of tiles scarred by a destroyed obstacle.
+        obstacle_version (int): A counter bumped whenever the obstacle grid changes.
+        chunks (dict): Baked chunk surfaces keyed by (chunk row, chunk column).
+        chunk_versions (dict): The number of times each chunk has been baked.
+        dirty_chunks (set): The chunks that must be re-baked before they are drawn.
+        crater_image (pygame.Surface): The decal drawn on crater tiles.
         size (int): The size of the environment (number of tiles in a row/column).
         image_dict (dict): A dictionary mapping tile IDs to their corresponding images.
+        object_dict (dict): A dictionary mapping object IDs to their corresponding images.
         bullet_explosion_images (list): A list of image frames for bullet explosions.
         tank_explosion_images (list): A list of image frames for tank explosions.
 
@@ -17,8 +34,29 @@ class Environment():
         generate_map_tile():
             Generate an empty tilemap for the environment.
 
+        generate_procedural_map(width, height, seed):
+            Generate a seeded procedural tilemap and obstacle map.
+
+        clear_obstacles(rect):
+            Remove the obstacles from every tile a pixel rectangle touches.
+
         load_terrain():
-            Load the terrain images based on the tilemap.
+            Load the terrain and obstacle images used by the tilemap.
+
+        opaque_grid():
+            Get the tiles that block sight and bullets.
+
+        damage_obstacle(row, col, amount):
+            Damage the obstacle on a tile and destroy it when its health runs out.
+
+        reset_obstacles():
+            Restore every obstacle destroyed since the terrain was loaded.
+
+        bake_chunk(chunk):
+            Render the tiles, craters and obstacles of one chunk onto its surface.
+
+        visible_chunks(width, height):
+            Get the baked chunks covering the top-left width x height pixels.
 
         update(screen):
             Update and render the environment on the game screen.
@@ -32,8 +70,22 @@ class Environment():
         Initialize an Environment object.
         """
         self.tilemap = []
+        self.obstacles = None
+        self.initial_obstacles = None
+        self.obstacle_health = None
+        self.craters = None
+        self.obstacle_version = 0
+        self.chunks = {}
+        self.chunk_versions = {}
+        self.dirty_chunks = set()
+        self.crater_image = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
+        pygame.draw.circle(self.crater_image, (70, 55, 35, 140), (TILE_SIZE // 2, TILE_SIZE // 2), TILE_SIZE // 3)
+        pygame.draw.circle(self.crater_image, (40, 30, 20, 170), (TILE_SIZE // 2, TILE_SIZE // 2), TILE_SIZE // 5)
+        self.opaque = None
+        self.opaque_version = None
         self.size = 0
         self.image_dict = {}
+        self.object_dict = {}
         self.bullet_explosion_images = []
         self.tank_explosion_images = []
         for num in range(5):
@@ -50,31 +102,223 @@ class Environment():
                 row.append(0)
             self.tilemap.append(row)
 
+    def generate_procedural_map(self, width, height, seed):
+        """
+        Generate a seeded procedural tilemap and obstacle map.
+
+        Args:
+            width (int): The width of the map in tiles.
+            height (int): The height of the map in tiles.
+            seed (int): The seed of the map; the same seed always gives the same map.
+        """
+        self.tilemap, self.obstacles = MapGenerator(seed).generate(width, height)
+        self.obstacle_version += 1
+        self.size = max(width, height)
+
+    def clear_obstacles(self, rect):
+        """
+        Remove the obstacles from every tile a pixel rectangle touches.
+
+        Tiles under the rectangle's edges are included, so a bullet spawned on
+        the edge of a tank's rect is not inside an obstacle. Must be called
+        before load_terrain().
+
+        Args:
+            rect (pygame.Rect): The area to clear, in pixels.
+        """
+        if self.obstacles is None:
+            return
+        rows, columns = self.obstacles.shape
+        top = max(rect.top // TILE_SIZE, 0)
+        left = max(rect.left // TILE_SIZE, 0)
+        bottom = min(rect.bottom // TILE_SIZE + 1, rows)
+        right = min(rect.right // TILE_SIZE + 1, columns)
+        self.obstacles[top:bottom, left:right] = 0
+        self.obstacle_version += 1
+
     def load_terrain(self):
         """
-        Load the terrain images based on the tilemap.
+        Load the terrain and obstacle images used by the tilemap.
         """
-        for row in self.tilemap:
-            for tile_id in row:
-                # Load the tile image based on the tile_id
+        for tile_id in np.unique(self.tilemap).tolist():
+            # Load the tile image based on the tile_id
+            if not self.image_dict.get(tile_id):
                 tile_image, _ = load_image(tile_id)
-                if not self.image_dict.get(tile_id):
-                    self.image_dict[tile_id] = tile_image
+                self.image_dict[tile_id] = tile_image
+
+        if self.obstacles is not None:
+            for object_id in np.unique(self.obstacles).tolist():
+                if object_id and not self.object_dict.get(object_id):
+                    object_image, _ = load_object(object_id)
+                    self.object_dict[object_id] = object_image
+            self.initial_obstacles = self.obstacles.copy()
+            self.obstacle_health = self.full_health()
+            self.craters = np.zeros(self.obstacles.shape, dtype=np.bool_)
+
+        self.chunks.clear()
+        self.chunk_versions.clear()
+        self.dirty_chunks.clear()
+
+    def full_health(self):
+        """
+        Get the health of every obstacle on the map before any damage.
+
+        Returns:
+            numpy.ndarray: A 2D array of the hits each obstacle takes, per OBJECT_HEALTH.
+        """
+        health = np.zeros(max(OBJECT_HEALTH) + 1, dtype=np.uint8)
+        for object_id, hits in OBJECT_HEALTH.items():
+            health[object_id] = hits
+        return health[self.obstacles]
+
+    def opaque_grid(self):
+        """
+        Get the tiles that block sight and bullets.
+
+        The grid is cached until obstacle_version changes, and damage_obstacle
+        keeps the cached grid up to date in place.
+
+        Returns:
+            numpy.ndarray: A 2D boolean array that is True for tiles holding an obstacle.
+        """
+        if self.opaque_version != self.obstacle_version or self.opaque is None:
+            if self.obstacles is None:
+                self.opaque = np.zeros(np.shape(self.tilemap), dtype=np.bool_)
+            else:
+                self.opaque = self.obstacles != 0
+            self.opaque_version = self.obstacle_version
+        return self.opaque
+
+    def damage_obstacle(self, row, col, amount=1):
+        """
+        Damage the obstacle on a tile and destroy it when its health runs out.
+
+        A destroyed obstacle leaves a crater, clears its collision cell and
+        marks only its own chunk for re-baking.
+
+        Args:
+            row (int): The row of the tile.
+            col (int): The column of the tile.
+            amount (int): The number of hits to apply.
+
+        Returns:
+            bool: True if the obstacle was destroyed.
+        """
+        if self.obstacles is None or not self.obstacles[row, col]:
+            return False
+        if self.obstacle_health[row, col] > amount:
+            self.obstacle_health[row, col] -= amount
+            return False
+
+        self.obstacle_health[row, col] = 0
+        self.obstacles[row, col] = 0
+        self.craters[row, col] = True
+        self.obstacle_version += 1
+        if self.opaque is not None and self.opaque_version == self.obstacle_version - 1:
+            self.opaque[row, col] = False
+            self.opaque_version = self.obstacle_version
+        self.dirty_chunks.add((row // CHUNK_TILES, col // CHUNK_TILES))
+        return True
+
+    def reset_obstacles(self):
+        """
+        Restore every obstacle destroyed since the terrain was loaded.
+
+        Obstacle health is refilled, craters are removed and every chunk is
+        marked for re-baking.
+        """
+        if self.initial_obstacles is None:
+            return
+        self.obstacles[:] = self.initial_obstacles
+        self.obstacle_health[:] = self.full_health()
+        self.craters[:] = False
+        self.obstacle_version += 1
+        self.dirty_chunks.update(self.chunks)
+
+    def bake_chunk(self, chunk):
+        """
+        Render the tiles, craters and obstacles of one chunk onto its surface.
+
+        Args:
+            chunk (tuple): The (chunk row, chunk column) to bake.
+
+        Returns:
+            pygame.Surface: The baked chunk surface.
+        """
+        rows, columns = np.shape(self.tilemap)
+        top = chunk[0] * CHUNK_TILES
+        left = chunk[1] * CHUNK_TILES
+        bottom = min(top + CHUNK_TILES, rows)
+        right = min(left + CHUNK_TILES, columns)
+
+        surface = self.chunks.get(chunk)
+        if surface is None:
+            surface = pygame.Surface(((right - left) * TILE_SIZE, (bottom - top) * TILE_SIZE))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            self.chunks[chunk] = surface
+
+        for y in range(top, bottom):
+            row = self.tilemap[y]
+            for x in range(left, right):
+                surface.blit(self.image_dict[row[x]], ((x - left) * TILE_SIZE, (y - top) * TILE_SIZE))
+
+        if self.obstacles is not None:
+            for y, x in np.argwhere(self.craters[top:bottom, left:right]).tolist():
+                surface.blit(self.crater_image, (x * TILE_SIZE, y * TILE_SIZE))
+            obstacles = self.obstacles[top:bottom, left:right]
+            for y, x in np.argwhere(obstacles).tolist():
+                image = self.object_dict[obstacles[y, x]]
+                surface.blit(image, image.get_rect(center=(x * TILE_SIZE + TILE_SIZE // 2, y * TILE_SIZE + TILE_SIZE // 2)))
+
+        self.dirty_chunks.discard(chunk)
+        self.chunk_versions[chunk] = self.chunk_versions.get(chunk, 0) + 1
+        return surface
+
+    def visible_chunks(self, width, height):
+        """
+        Get the baked chunks covering the top-left width x height pixels.
+
+        Chunks are baked here when they are new or dirty.
+
+        Args:
+            width (int): The width of the visible area in pixels.
+            height (int): The height of the visible area in pixels.
+
+        Returns:
+            list: A (chunk, surface, position, version) tuple per chunk.
+        """
+        rows, columns = np.shape(self.tilemap)
+        chunk_size = CHUNK_TILES * TILE_SIZE
+        chunk_rows = -(-min(-(-height // TILE_SIZE), rows) // CHUNK_TILES)
+        chunk_columns = -(-min(-(-width // TILE_SIZE), columns) // CHUNK_TILES)
+        chunks = []
+        for chunk_row in range(chunk_rows):
+            for chunk_column in range(chunk_columns):
+                chunk = (chunk_row, chunk_column)
+                surface = self.chunks.get(chunk)
+                if surface is None or chunk in self.dirty_chunks:
+                    surface = self.bake_chunk(chunk)
+                chunks.append((chunk, surface, (chunk_column * chunk_size, chunk_row * chunk_size), self.chunk_versions[chunk]))
+        return chunks
 
     def update(self, screen):
         """
         Update and render the environment on the game screen.
 
+        Only chunks that are on screen are baked, and only when they are new or dirty.
+
         Args:
             screen (pygame.Surface): The Pygame surface on which to render the environment.
         """
-        for y, row in enumerate(self.tilemap):
-            for x, tile_id in enumerate(self.tilemap[y]):
-                screen.blit(self.image_dict[tile_id], (x * TILE_SIZE, y * TILE_SIZE))
+        screen.blits(
+            [(surface, position) for _, surface, position, _ in self.visible_chunks(screen.get_width(), screen.get_height())],
+            doreturn=False,
+        )
 
     def generate_tile_map_1(self):
         """
-        Generate a specific tilemap for the game environment.
+        Generate a specific tilemap and obstacle map for the game environment.
         """
         self.tilemap = [
             [11, 11, 11, 11, 11, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
@@ -87,6 +331,20 @@ class Environment():
             [11, 11, 11, 11, 11, 10, 0, 6, 1, 1, 1, 1, 1, 5, 0, 0],
             [11, 11, 11, 11, 11, 10, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
         ]
+        # object ids from OBJECT_IMAGE_MAPPING in helpers.py, kept off the roads and the tanks' spawn tiles
+        self.obstacles = np.array([
+            [0, 0, 0, 3, 0, 0, 1, 0, 0, 0, 0, 2, 0, 0, 0, 1],
+            [0, 7, 0, 0, 0, 0, 0, 0, 0, 5, 0, 0, 0, 0, 2, 0],
+            [0, 0, 0, 0, 9, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 11, 0, 0, 5, 0, 0, 0],
+            [0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0, 6, 0, 0, 0, 0],
+            [0, 8, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 4, 0, 0, 0, 0, 0, 12, 0, 0, 11, 0, 0, 1, 0],
+            [0, 0, 0, 7, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2],
+            [3, 0, 0, 0, 0, 0, 2, 0, 0, 1, 0, 0, 4, 0, 0, 0],
+        ], dtype=np.uint8)
+        self.obstacle_version += 1
+        self.size = max(len(self.tilemap), len(self.tilemap[0]))
 
     # id ====== tile
     # 0 ====== normal grass
@@ -101,3 +359,36 @@ class Environment():
     # 9 ====== road transition west
     # 10 ===== tilegrass transition east
     # 11 ===== tilesand
+    # 12+ ==== see TILE_IMAGE_MAPPING in helpers.py
+
+if __name__ == "__main__":
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.HIDDEN)
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    environment = Environment()
+    environment.generate_procedural_map(1000, 1000, 1234)
+    environment.load_terrain()
+    environment.obstacle_health[:] = 1
+    environment.update(screen)
+    environment.opaque_grid()
+
+    def average_ms(action, repeats):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            action()
+        return (time.perf_counter() - start) / repeats * 1000
+
+    def full_rebake():
+        environment.chunks.clear()
+        environment.update(screen)
+
+    targets = np.argwhere(environment.obstacles[:SCREEN_HEIGHT // TILE_SIZE, :SCREEN_WIDTH // TILE_SIZE]).tolist()
+
+    def hit():
+        row, col = targets.pop()
+        environment.damage_obstacle(row, col)
+        environment.update(screen)
+
+    hits = len(targets)
+    print(f"frame with clean chunks: {average_ms(lambda: environment.update(screen), 200):.3f} ms")
+    print(f"frame after a hit (dirty chunk re-bake): {average_ms(hit, hits):.3f} ms over {hits} hits")
+    print(f"frame with a full re-bake of the screen: {average_ms(full_rebake, 50):.3f} ms")
@@ -1,5 +1,6 @@
 import pygame
 from helpers import load_png
+from constants import EXPLOSION_FRAME_TIME
 
 class Explosion(pygame.sprite.Sprite):
     """
@@ -11,11 +12,11 @@ class Explosion(pygame.sprite.Sprite):
         image (pygame.Surface): The current frame image.
         rect (pygame.Rect): The rectangular boundary for the explosion animation.
         finished (bool): Indicates whether the explosion animation is finished.
-        animation_speed (int): The speed at which the animation frames change.
-        animation_counter (int): A counter for managing animation frame changes.
+        animation_speed (float): The time in seconds each animation frame is shown.
+        animation_counter (float): The time in seconds the current frame has been shown.
 
     Methods:
-        update():
+        update(dt):
             Update the explosion animation by changing frames.
 
         draw(screen):
@@ -40,22 +41,25 @@ class Explosion(pygame.sprite.Sprite):
         self.rect = self.images[self.index][1]
         self.rect.center = (x, y)
         self.finished = False
-        self.animation_speed = 8
-        self.animation_counter = 0
+        self.animation_speed = EXPLOSION_FRAME_TIME
+        self.animation_counter = 0.0
 
-    def update(self):
+    def update(self, dt):
         """
         Update the explosion animation by changing frames.
+
+        Args:
+            dt (float): The length of the simulation tick in seconds.
         """
         if not self.finished:
-            self.animation_counter += 1
+            self.animation_counter += dt
             if self.animation_counter >= self.animation_speed:
                 self.index += 1
                 if self.index >= len(self.images):
                     self.finished = True
                 else:
                     self.image = self.images[self.index][0]
-                self.animation_counter = 0
+                self.animation_counter -= self.animation_speed
 
     def draw(self, screen):
         """
@@ -0,0 +1,79 @@
+from constants import TICK_DT, MAX_FRAME_TIME, MAX_TICKS_PER_FRAME
+
+class FixedTimestep():
+    """
+    A class implementing a fixed-timestep accumulator for the game loop.
+
+    Real elapsed time is fed in once per rendered frame and consumed in
+    fixed-size simulation ticks, so the game runs at the same speed no matter
+    how fast frames are rendered. The leftover fraction of a tick is exposed
+    as an interpolation factor for rendering.
+
+    Attributes:
+        dt (float): The length of one simulation tick in seconds.
+        max_frame_time (float): The largest frame time accepted before clamping.
+        max_ticks (int): The maximum number of ticks run for a single frame.
+        accumulator (float): The simulation time not yet consumed by ticks.
+        dropped_time (float): The total simulation time discarded by the spiral-of-death guard.
+
+    Methods:
+        advance(frame_time):
+            Add elapsed time and return the number of ticks to simulate.
+
+        alpha():
+            Get the interpolation factor between the last two ticks.
+    """
+
+    def __init__(self, dt=TICK_DT, max_frame_time=MAX_FRAME_TIME, max_ticks=MAX_TICKS_PER_FRAME):
+        """
+        Initialize a FixedTimestep object.
+
+        Args:
+            dt (float): The length of one simulation tick in seconds.
+            max_frame_time (float): The largest frame time accepted before clamping.
+            max_ticks (int): The maximum number of ticks run for a single frame.
+        """
+        self.dt = dt
+        self.max_frame_time = max_frame_time
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+        self.dropped_time = 0.0
+
+    def advance(self, frame_time):
+        """
+        Add elapsed time and return the number of ticks to simulate.
+
+        Long stalls are clamped to max_frame_time, and no more than max_ticks
+        are returned. Any backlog left after that is dropped, so a machine that
+        cannot keep up skips simulation time instead of slowing the game down.
+
+        Args:
+            frame_time (float): The real time elapsed since the last frame in seconds.
+
+        Returns:
+            int: The number of fixed ticks to simulate this frame.
+        """
+        if frame_time > self.max_frame_time:
+            self.dropped_time += frame_time - self.max_frame_time
+            frame_time = self.max_frame_time
+        self.accumulator += frame_time
+
+        ticks = int(self.accumulator // self.dt)
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+        self.accumulator -= ticks * self.dt
+
+        if self.accumulator >= self.dt:
+            self.dropped_time += self.accumulator - self.accumulator % self.dt
+            self.accumulator %= self.dt
+
+        return ticks
+
+    def alpha(self):
+        """
+        Get the interpolation factor between the last two ticks.
+
+        Returns:
+            float: A value in [0, 1) describing how far the render time is past the last tick.
+        """
+        return self.accumulator / self.dt
@@ -1,14 +1,124 @@
 import os
-from constants import WHITE
+from constants import WHITE, ASSET_BUNDLE_PATH
+from asset_bundle import AssetBundle
 import pygame
 
 pygame.font.init()
 FONT = pygame.font.Font(None, 36)
+ASSET_BUNDLE = None
+
+# Mapping of tile IDs to image filenames
+TILE_IMAGE_MAPPING = {
+    0: "tileGrass1.png",
+    1: "tileGrass_roadEast.png",
+    2: "tileGrass_roadNorth.png",
+    3: "tileGrass_roadCornerLL.png",
+    4: "tileGrass_roadCornerLR.png",
+    5: "tileGrass_roadCornerUL.png",
+    6: "tileGrass_roadCornerUR.png",
+    7: "tileGrass_roadCrossing.png",
+    8: "tileGrass_roadCrossingRound.png",
+    9: "tileGrass_roadTransitionW.png",
+    10: "tileGrass_transitionW.png",
+    11: "tileSand1.png",
+    12: "tileGrass2.png",
+    13: "tileGrass_roadSplitN.png",
+    14: "tileGrass_roadSplitE.png",
+    15: "tileGrass_roadSplitS.png",
+    16: "tileGrass_roadSplitW.png",
+    17: "tileGrass_roadTransitionN.png",
+    18: "tileGrass_roadTransitionE.png",
+    19: "tileGrass_roadTransitionS.png",
+    20: "tileGrass_roadTransitionN_dirt.png",
+    21: "tileGrass_roadTransitionE_dirt.png",
+    22: "tileGrass_roadTransitionS_dirt.png",
+    23: "tileGrass_roadTransitionW_dirt.png",
+    24: "tileGrass_transitionN.png",
+    25: "tileGrass_transitionE.png",
+    26: "tileGrass_transitionS.png",
+    27: "tileSand2.png",
+    28: "tileSand_roadEast.png",
+    29: "tileSand_roadNorth.png",
+    30: "tileSand_roadCornerLL.png",
+    31: "tileSand_roadCornerLR.png",
+    32: "tileSand_roadCornerUL.png",
+    33: "tileSand_roadCornerUR.png",
+    34: "tileSand_roadCrossing.png",
+    35: "tileSand_roadCrossingRound.png",
+    36: "tileSand_roadSplitN.png",
+    37: "tileSand_roadSplitE.png",
+    38: "tileSand_roadSplitS.png",
+    39: "tileSand_roadSplitW.png",
+}
+
+# Mapping of object IDs to image filenames and sizes (0 means no object)
+OBJECT_IMAGE_MAPPING = {
+    1: ("treeGreen_large.png", (64, 64)),
+    2: ("treeGreen_small.png", (36, 36)),
+    3: ("treeBrown_large.png", (64, 64)),
+    4: ("treeBrown_small.png", (36, 36)),
+    5: ("crateWood.png", (28, 28)),
+    6: ("crateMetal.png", (28, 28)),
+    7: ("barrelBlack_top.png", (24, 24)),
+    8: ("barrelRust_top.png", (24, 24)),
+    9: ("sandbagBeige.png", (32, 22)),
+    10: ("sandbagBrown.png", (32, 22)),
+    11: ("barricadeWood.png", (28, 28)),
+    12: ("barricadeMetal.png", (28, 28)),
+}
+
+# Number of bullet hits each object ID takes before it is destroyed
+OBJECT_HEALTH = {
+    1: 4,
+    2: 2,
+    3: 4,
+    4: 2,
+    5: 2,
+    6: 5,
+    7: 1,
+    8: 1,
+    9: 3,
+    10: 3,
+    11: 3,
+    12: 6,
+}
+
+def use_asset_bundle(path=ASSET_BUNDLE_PATH):
+    """
+    Serve images from a pre-scaled asset bundle instead of PNG files.
+
+    A bundle whose source images changed since it was built is not used.
+
+    Args:
+        path (str): The path of the bundle file.
+
+    Returns:
+        bool: True if the bundle was opened, False if it is missing, invalid or out of date.
+    """
+    global ASSET_BUNDLE
+
+    if not os.path.exists(path):
+        return False
+    try:
+        bundle = AssetBundle(path)
+    except ValueError as error:
+        print(error)
+        return False
+    stale = bundle.stale_entries()
+    if stale:
+        print(f"{path} is out of date ({len(stale)} changed assets), loading PNG files; run python asset_bundle.py")
+        bundle.close()
+        return False
+    ASSET_BUNDLE = bundle
+    return True
 
 def load_png(name, size, image_cat, image_type):
     """
     Load an image and return the image object.
 
+    Images found in the asset bundle are returned without decoding or scaling;
+    each call returns its own copy of the pixels, as with PNG files.
+
     Args:
         name (str): The name of the image file.
         size (tuple): The size to which the image should be scaled.
@@ -22,14 +132,26 @@ def load_png(name, size, image_cat, image_type):
         SystemExit: If the image cannot be loaded.
     """
 
+    if ASSET_BUNDLE is not None:
+        image = ASSET_BUNDLE.load(name, size, image_cat, image_type)
+        if image is not None:
+            if image.get_alpha() is None and pygame.display.get_surface() is not None:
+                image = image.convert()
+            else:
+                # bundle surfaces share the mapped pages with every other load of the asset
+                image = image.copy()
+            return image, image.get_rect()
+
     images_folder = os.path.join('assets', image_cat, image_type)
     fullname = os.path.join(images_folder, name)
     try:
         image = pygame.transform.scale(pygame.image.load(fullname), size)
-        if image.get_alpha() is None:
-            image = image.convert()
-        else:
-            image.convert_alpha()
+        # the texture renderer has no display surface to convert to
+        if pygame.display.get_surface() is not None:
+            if image.get_alpha() is None:
+                image = image.convert()
+            else:
+                image.convert_alpha()
     except FileNotFoundError:
         print(f"Cannot load image: {fullname}")
         raise SystemExit
@@ -47,25 +169,22 @@ def load_image(tile_id):
         pygame.Surface: The loaded image corresponding to the tile ID.
     """
 
-    # Mapping of tile IDs to image filenames
-    tile_image_mapping = {
-        0: "tileGrass1.png",
-        1: "tileGrass_roadEast.png",
-        2: "tileGrass_roadNorth.png",
-        3: "tileGrass_roadCornerLL.png",
-        4: "tileGrass_roadCornerLR.png",
-        5: "tileGrass_roadCornerUL.png",
-        6: "tileGrass_roadCornerUR.png",
-        7: "tileGrass_roadCrossing.png",
-        8: "tileGrass_roadCrossingRound.png",
-        9: "tileGrass_roadTransitionW.png",
-        10: "tileGrass_transitionW.png",
-        11: "tileSand1.png"
-    }
-
-    image_name = tile_image_mapping.get(tile_id, "tileGrass1.png")
+    image_name = TILE_IMAGE_MAPPING.get(tile_id, "tileGrass1.png")
     return load_png(image_name, (64, 64), "tilesets", "terrain")
 
+def load_object(object_id):
+    """
+    Load and return an obstacle image based on the object ID.
+
+    Args:
+        object_id (int): The ID of the object.
+
+    Returns:
+        pygame.Surface: The loaded image corresponding to the object ID.
+    """
+    image_name, size = OBJECT_IMAGE_MAPPING[object_id]
+    return load_png(image_name, size, "tilesets", "objects")
+
 def display_health(health, screen):
     """
     Display the player's health on the screen.
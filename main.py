@@ -1,119 +1,273 @@
 import pygame
 import sys
+import numpy as np
 
 from constants import *
 from tank import Tank
 from menu import Menu
 from environment import Environment
-from explosion import Explosion
-
-pygame.init()
-
-# Create the game window
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Tankers")
-clock = pygame.time.Clock()
-
-# Create sprite groups for tanks and bullets
-tank_group = pygame.sprite.Group()
-bullet_group = pygame.sprite.Group()
-
-# Initialize player tanks
-tank_player_1 = Tank(SCREEN_WIDTH - (50 + NORMAL_TANK_SIZE[0]), SCREEN_HEIGHT // 2, 1, TANK_TYPE_BLUE)
-tank_player_2 = Tank(50, SCREEN_HEIGHT // 2, 2, TANK_TYPE_BLUE)
-tank_group.add(tank_player_1, tank_player_2)
-
-# Initialize lists for bullets and explosions
-bullets = []
-explosions = []
-
-# Create game menu and game environment
-menu = Menu()
-environment = Environment()
-environment.generate_tile_map_1()
-environment.load_terrain()
-menu_visible = True
-
-# Main game loop
-game_running = True
-while game_running:
-    clock.tick(FPS)
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            game_running = False
-
-    screen.fill(WHITE)
-    environment.update(screen)
-    
-    if menu_visible:
-        menu.render(screen)
-        result = menu.handle_input()
-        if result == "start_game":
-            menu_visible = False
-    else:
-        # Update and render tank groups
-        tank_group.update(screen, bullets)
-        
-        # Update and check for collisions with bullets
-        for bullet in bullets:
-            bullet.update(screen)
-            if (
-                bullet.rect.left < 0
-                or bullet.rect.right > SCREEN_WIDTH
-                or bullet.rect.top < 0
-                or bullet.rect.bottom > SCREEN_HEIGHT
-            ):
-                bullets.remove(bullet)
-                
-            for bullet2 in bullets:
-                if bullet != bullet2:
-                    if bullet.rect.colliderect(bullet2.rect):
-                        if bullet in bullets and bullet2 in bullets:
-                            bullets.remove(bullet)
-                            bullets.remove(bullet2)
-                            explosion1 = Explosion(bullet.rect.centerx, bullet.rect.centery, 15, 15, environment.bullet_explosion_images)
-                            explosion2 = Explosion(bullet2.rect.centerx, bullet2.rect.centery, 15, 15, environment.bullet_explosion_images)
-                            explosions.append(explosion1)
-                            explosions.append(explosion2)
-            
-            for tank in tank_group:
-                if bullet.rect.colliderect(tank.rect) and bullet.id != tank.player:
-                    if bullet in bullets:
-                        bullets.remove(bullet)
-                        explosion = Explosion(bullet.rect.centerx, bullet.rect.centery, 15, 15, environment.bullet_explosion_images)
-                        explosions.append(explosion)
-                        tank.reduce_health(10)
-
-                    if tank.get_health() < 10:
-                        explosion2 = Explosion(tank.rect.centerx, tank.rect.centery, NORMAL_TANK_SIZE[0], NORMAL_TANK_SIZE[1], environment.tank_explosion_images)
-                        explosions.append(explosion2)
-                        tank.reset()
-
-                    if tank.lives < 1:
-                        for tank in tank_group:
-                            tank.reset()
-                            tank.lives = 3
-                        explosions.clear()
-                        bullets.clear()
-                        menu_visible = True
-        
+from game_loop import FixedTimestep
+from helpers import use_asset_bundle
+from fog_of_war import FogOfWar
+from renderer import create_renderer
+from memory_monitor import MemoryMonitor, entity_counts, format_report
+from recorder import FrameRecorder, format_stats
+from telemetry import TelemetryStream, EVENT_CANCEL, EVENT_HIT, EVENT_DEATH, EVENT_ROUND_END
+from ecs import EntityStore, KIND_TANK, KIND_BULLET, KIND_EXPLOSION
+from systems import (
+    spawn_explosion, movement_system, cooldown_system, bounds_system,
+    bullet_collision_system, bullet_hit_system, bullet_obstacle_system, explosion_system,
+)
+
+class Game():
+    """
+    A class representing the Tankers game and its main loop.
+
+    The simulation advances in fixed ticks of TICK_DT seconds, independent of
+    the render rate. Rendering happens once per loop iteration and interpolates
+    moving sprites between the last two ticks.
+
+    Attributes:
+        renderer (SurfaceRenderer or TextureRenderer): The renderer backend selected by RENDERER.
+        clock (pygame.time.Clock): The clock used to measure frame time.
+        timestep (FixedTimestep): The fixed-timestep accumulator.
+        store (EntityStore): The entity store holding tanks, bullets and explosions.
+        tank_group (pygame.sprite.Group): The group holding both player tanks.
+        menu (Menu): The game menu.
+        environment (Environment): The game environment and terrain.
+        fog (FogOfWar): The per-player visibility, or None when FOG_OF_WAR is off.
+        memory (MemoryMonitor): The memory diagnostics, or None when MEMORY_DIAGNOSTICS is off.
+        recorder (FrameRecorder): The gameplay recorder, toggled with F9.
+        telemetry (TelemetryStream): The match event stream, recording when TELEMETRY is on.
+        tick (int): The number of simulation ticks run so far.
+        last_hit_by (dict): The player who last hit each player's tank.
+        menu_visible (bool): Whether the menu is shown instead of the match.
+        game_running (bool): Whether the main loop should keep running.
+
+    Methods:
+        run():
+            Run the main game loop until the window is closed.
+
+        frame(frame_time):
+            Handle events, run the ticks due and draw one frame.
+
+        simulate(dt):
+            Advance the game state by one fixed tick.
+
+        render(alpha):
+            Draw the current frame, interpolating between the last two ticks.
+    """
+
+    def __init__(self):
+        """
+        Initialize a Game object, creating the window and the game objects.
+        """
+        pygame.init()
+
+        # Create the game window
+        self.renderer = create_renderer(RENDERER, "Tankers")
+        use_asset_bundle(ASSET_BUNDLE_PATH)
+        self.clock = pygame.time.Clock()
+        self.timestep = FixedTimestep()
+
+        # Initialize player tanks in the entity store
+        self.store = EntityStore()
+        self.tank_group = pygame.sprite.Group()
+        tank_player_1 = Tank(SCREEN_WIDTH - (50 + NORMAL_TANK_SIZE[0]), SCREEN_HEIGHT // 2, 1, TANK_TYPE_BLUE, self.store)
+        tank_player_2 = Tank(50, SCREEN_HEIGHT // 2, 2, TANK_TYPE_BLUE, self.store)
+        self.tank_group.add(tank_player_1, tank_player_2)
+
+        # Create game menu and game environment
+        self.menu = Menu()
+        self.environment = Environment()
+        if MAP_SEED is None:
+            self.environment.generate_tile_map_1()
+        else:
+            self.environment.generate_procedural_map(SCREEN_WIDTH // TILE_SIZE, SCREEN_HEIGHT // TILE_SIZE, MAP_SEED)
+        # keep spawn tiles clear so the tanks' first bullets are not spawned inside an obstacle
+        for tank in self.tank_group:
+            self.environment.clear_obstacles(tank.rect)
+        self.environment.load_terrain()
+        self.bullet_explosion_sprite = self.store.register_sprite(
+            "bullet_explosion", [image for image, _ in self.environment.bullet_explosion_images]
+        )
+        self.tank_explosion_sprite = self.store.register_sprite(
+            "tank_explosion", [image for image, _ in self.environment.tank_explosion_images]
+        )
+        self.fog = None
+        if FOG_OF_WAR:
+            self.fog = FogOfWar(np.shape(self.environment.tilemap), [tank.player for tank in self.tank_group])
+        self.menu_visible = True
+        self.game_running = True
+        self.recorder = FrameRecorder()
+        self.telemetry = TelemetryStream()
+        if TELEMETRY:
+            self.telemetry.start()
+        for tank in self.tank_group:
+            tank.telemetry = self.telemetry
+        self.tick = 0
+        self.last_hit_by = {}
+        self.memory = None
+        if MEMORY_DIAGNOSTICS:
+            self.memory = MemoryMonitor()
+            self.memory.start()
+
+    def run(self):
+        """
+        Run the main game loop until the window is closed.
+        """
+        while self.game_running:
+            self.frame(self.clock.tick(RENDER_FPS) / 1000)
+
+            if self.memory is not None:
+                report = self.memory.end_frame(entity_counts(self.store, self.tank_group))
+                if report is not None:
+                    print(format_report(report))
+
+        if self.recorder.recording:
+            self.recorder.stop()
+            print(format_stats(self.recorder.stats()))
+        self.telemetry.stop()
+        if self.telemetry.dropped:
+            print(f"telemetry: {self.telemetry.dropped} events dropped, counted in their match files")
+
+    def frame(self, frame_time):
+        """
+        Handle events, run the ticks due and draw one frame.
+
+        Args:
+            frame_time (float): The real time elapsed since the previous frame in seconds.
+        """
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.game_running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                if self.recorder.recording:
+                    self.recorder.stop()
+                    print(format_stats(self.recorder.stats()))
+                else:
+                    self.recorder.start()
+                    print(f"Recording to {self.recorder.directory}")
+
+        for _ in range(self.timestep.advance(frame_time)):
+            self.simulate(self.timestep.dt)
+
+        self.render(self.timestep.alpha())
+        if self.recorder.recording:
+            self.recorder.capture(self.renderer.read_pixels())
+        self.renderer.present()
+
+    def simulate(self, dt):
+        """
+        Advance the game state by one fixed tick.
+
+        Args:
+            dt (float): The length of the simulation tick in seconds.
+        """
+        store = self.store
+        tank_group = self.tank_group
+        telemetry = self.telemetry
+        self.tick += 1
+        tick = self.tick
+        telemetry.tick = tick
+
+        if self.menu_visible:
+            result = self.menu.handle_input()
+            if result == "start_game":
+                self.menu_visible = False
+            return
+
+        # Move entities and handle tank input
+        movement_system(store, dt)
+        cooldown_system(store, dt)
+        for tank in tank_group:
+            tank.event_handler(store, dt)
+
+        # Remove bullets that left the screen and resolve bullet collisions
+        bounds_system(store)
+        for x, y, owner in bullet_collision_system(store):
+            spawn_explosion(store, x, y, self.bullet_explosion_sprite, (15, 15))
+            telemetry.record(tick, EVENT_CANCEL, owner, x=x, y=y)
+        for x, y, tank, owner, health in bullet_hit_system(store, BULLET_DAMAGE):
+            spawn_explosion(store, x, y, self.bullet_explosion_sprite, (15, 15))
+            target = int(store.owner[tank])
+            self.last_hit_by[target] = owner
+            telemetry.record(tick, EVENT_HIT, owner, target, health, x, y)
+        for x, y, row, col in bullet_obstacle_system(store, self.environment.opaque_grid()):
+            spawn_explosion(store, x, y, self.bullet_explosion_sprite, (15, 15))
+            self.environment.damage_obstacle(row, col)
+
+        for tank in tank_group:
+            if tank.get_health() < 10:
+                x, y = tank.rect.center
+                spawn_explosion(store, x, y, self.tank_explosion_sprite, NORMAL_TANK_SIZE)
+                tank.reset()
+                telemetry.record(tick, EVENT_DEATH, tank.player, self.last_hit_by.pop(tank.player, 0), tank.lives, x, y)
+
+            if tank.lives < 1:
+                for winner in tank_group:
+                    if winner is not tank:
+                        telemetry.record(tick, EVENT_ROUND_END, winner.player, tank.player)
+                telemetry.rotate()
+                self.last_hit_by.clear()
+                for tank in tank_group:
+                    tank.reset()
+                    tank.lives = 3
+                store.clear(KIND_EXPLOSION)
+                store.clear(KIND_BULLET)
+                self.environment.reset_obstacles()
+                self.menu_visible = True
+                break
+
         # Handle tank-to-tank collisions
         for tank_player_1 in tank_group:
             for tank_player_2 in tank_group:
                 if tank_player_1 != tank_player_2:
                     if tank_player_1.rect.colliderect(tank_player_2.rect):
                         tank_player_1.handle_collision(tank_player_2)
-        
-        # Update and draw explosions
-        for explosion in explosions:
-            explosion.update()
-            explosion.draw(screen)
-        
-        # Remove finished explosions
-        explosions = [explosion for explosion in explosions if not explosion.finished]
-    
-    pygame.display.flip()
-
-# Quit Pygame
-pygame.quit()
-sys.exit()
+
+        # Advance explosions and remove finished ones
+        explosion_system(store, dt)
+
+        # Recompute visibility for players who changed tile
+        if self.fog is not None:
+            self.fog.update(
+                {tank.player: tank.pos for tank in tank_group},
+                self.environment.opaque_grid(), self.environment.obstacle_version,
+            )
+
+    def render(self, alpha):
+        """
+        Draw the current frame, interpolating between the last two ticks.
+
+        Args:
+            alpha (float): How far the render time is between the previous and current tick.
+        """
+        renderer = self.renderer
+        renderer.begin(WHITE)
+        for chunk, surface, position, version in self.environment.visible_chunks(SCREEN_WIDTH, SCREEN_HEIGHT):
+            renderer.blit_surface(("chunk", chunk), surface, position, version)
+
+        if self.menu_visible:
+            renderer.draw_overlay(self.menu.render, self.menu.selected_option)
+            return
+
+        visible = None
+        if self.fog is not None:
+            visible = self.fog.visible_for(FOG_VIEWER)
+
+        renderer.draw_entities(self.store, alpha, KIND_TANK, visible)
+        renderer.draw_health_bars(self.store, alpha, visible)
+        renderer.draw_entities(self.store, alpha, KIND_BULLET, visible)
+        renderer.draw_entities(self.store, alpha, KIND_EXPLOSION, visible)
+
+        if self.fog is not None:
+            surface, key = self.fog.overlay(SCREEN_WIDTH, SCREEN_HEIGHT, FOG_VIEWER)
+            renderer.blit_surface("fog", surface, (0, 0), key)
+
+if __name__ == "__main__":
+    Game().run()
+
+    # Quit Pygame
+    pygame.quit()
+    sys.exit()
@@ -0,0 +1,405 @@
+import time
+import numpy as np
+
+from helpers import TILE_IMAGE_MAPPING
+
+# neighbor bits used by the road auto-tiler
+NORTH = 1
+EAST = 2
+SOUTH = 4
+WEST = 8
+
+TILE_IDS = {name[:-len(".png")]: tile_id for tile_id, name in TILE_IMAGE_MAPPING.items()}
+
+def _road_tile_table(biome):
+    """
+    Build the lookup table from a road neighbor bitmask to a tile ID.
+
+    Args:
+        biome (str): The biome prefix of the tiles ("Grass" or "Sand").
+
+    Returns:
+        numpy.ndarray: A 16-entry array of tile IDs indexed by bitmask.
+    """
+    shapes = {
+        0: "roadEast",
+        NORTH: "roadNorth",
+        SOUTH: "roadNorth",
+        NORTH | SOUTH: "roadNorth",
+        EAST: "roadEast",
+        WEST: "roadEast",
+        EAST | WEST: "roadEast",
+        NORTH | EAST: "roadCornerUR",
+        NORTH | WEST: "roadCornerUL",
+        SOUTH | EAST: "roadCornerLR",
+        SOUTH | WEST: "roadCornerLL",
+        NORTH | EAST | WEST: "roadSplitN",
+        NORTH | EAST | SOUTH: "roadSplitE",
+        EAST | SOUTH | WEST: "roadSplitS",
+        NORTH | SOUTH | WEST: "roadSplitW",
+        NORTH | EAST | SOUTH | WEST: "roadCrossing",
+    }
+    return np.array([TILE_IDS[f"tile{biome}_{shapes[mask]}"] for mask in range(16)], dtype=np.uint8)
+
+GRASS_ROAD_TILES = _road_tile_table("Grass")
+SAND_ROAD_TILES = _road_tile_table("Sand")
+
+# grass object IDs and sand object IDs from helpers.OBJECT_IMAGE_MAPPING
+GRASS_OBJECTS = np.array([1, 2, 3, 4, 5, 6], dtype=np.uint8)
+SAND_OBJECTS = np.array([7, 8, 9, 10, 11, 12], dtype=np.uint8)
+
+def _neighbors(grid):
+    """
+    Get the north, east, south and west neighbors of every cell.
+
+    Cells outside the grid count as False.
+
+    Args:
+        grid (numpy.ndarray): A 2D boolean array.
+
+    Returns:
+        tuple: The (north, east, south, west) neighbor arrays.
+    """
+    north = np.zeros_like(grid)
+    east = np.zeros_like(grid)
+    south = np.zeros_like(grid)
+    west = np.zeros_like(grid)
+    north[1:, :] = grid[:-1, :]
+    south[:-1, :] = grid[1:, :]
+    west[:, 1:] = grid[:, :-1]
+    east[:, :-1] = grid[:, 1:]
+    return north, east, south, west
+
+class MapGenerator():
+    """
+    A class generating seeded procedural tilemaps with NumPy.
+
+    Each stage draws from its own random stream derived from the seed, so the
+    same seed always produces the same map.
+
+    Attributes:
+        seed (int): The seed of the generator.
+        sand_fraction (float): The approximate share of the map covered by sand.
+        biome_scale (int): The size in tiles of the largest noise features.
+        road_spacing (tuple): The minimum and maximum number of tiles between parallel roads.
+        loop_chance (float): The chance that a road lattice edge outside the spanning tree is built.
+        dirt_track_chance (float): The chance that a loop road is left as a dirt track where it crosses sand.
+        round_crossing_chance (float): The chance that a crossing becomes a roundabout.
+        variant_chance (float): The chance that a plain tile uses its alternative image.
+        obstacle_density (float): The chance that an empty off-road tile holds an obstacle.
+
+    Methods:
+        generate(width, height):
+            Generate a tilemap and an obstacle map.
+
+        generate_biomes(width, height, rng):
+            Generate the sand/grass biome mask from value noise.
+
+        generate_roads(width, height, rng, sand):
+            Generate a connected road network mask.
+
+        spanning_tree(rows, columns, rng):
+            Pick a random spanning tree of a rows x columns lattice.
+
+        draw_spans(lines, lanes, starts, ends, shape):
+            Rasterize inclusive spans along parallel lines into a mask.
+
+        auto_tile(sand, roads, rng):
+            Pick a tile ID for every cell from its biome and neighbor bitmask.
+
+        scatter_obstacles(sand, roads, rng):
+            Scatter obstacles over the cells off the road network.
+    """
+
+    def __init__(self, seed=0, sand_fraction=0.35, biome_scale=24, road_spacing=(4, 12), loop_chance=0.3,
+                 dirt_track_chance=0.5, round_crossing_chance=0.25, variant_chance=0.15, obstacle_density=0.04):
+        """
+        Initialize a MapGenerator object.
+
+        Args:
+            seed (int): The seed of the generator.
+            sand_fraction (float): The approximate share of the map covered by sand.
+            biome_scale (int): The size in tiles of the largest noise features.
+            road_spacing (tuple): The minimum and maximum number of tiles between parallel roads.
+            loop_chance (float): The chance that a road lattice edge outside the spanning tree is built.
+            dirt_track_chance (float): The chance that a loop road is left as a dirt track where it crosses sand.
+            round_crossing_chance (float): The chance that a crossing becomes a roundabout.
+            variant_chance (float): The chance that a plain tile uses its alternative image.
+            obstacle_density (float): The chance that an empty off-road tile holds an obstacle.
+        """
+        self.seed = seed
+        self.sand_fraction = sand_fraction
+        self.biome_scale = biome_scale
+        self.road_spacing = road_spacing
+        self.loop_chance = loop_chance
+        self.dirt_track_chance = dirt_track_chance
+        self.round_crossing_chance = round_crossing_chance
+        self.variant_chance = variant_chance
+        self.obstacle_density = obstacle_density
+
+    def generate(self, width, height):
+        """
+        Generate a tilemap and an obstacle map.
+
+        Args:
+            width (int): The width of the map in tiles.
+            height (int): The height of the map in tiles.
+
+        Returns:
+            tuple: The (tilemap, obstacles) uint8 arrays of shape (height, width).
+            Obstacle IDs index helpers.OBJECT_IMAGE_MAPPING, with 0 meaning no obstacle.
+        """
+        biome_rng, road_rng, tile_rng, obstacle_rng = (
+            np.random.default_rng(child) for child in np.random.SeedSequence(self.seed).spawn(4)
+        )
+        sand = self.generate_biomes(width, height, biome_rng)
+        roads = self.generate_roads(width, height, road_rng, sand)
+        tilemap = self.auto_tile(sand, roads, tile_rng)
+        obstacles = self.scatter_obstacles(sand, roads, obstacle_rng)
+        return tilemap, obstacles
+
+    def generate_biomes(self, width, height, rng):
+        """
+        Generate the sand/grass biome mask from value noise.
+
+        Two octaves of bilinearly interpolated lattice noise are summed and
+        thresholded so roughly sand_fraction of the cells become sand.
+
+        Args:
+            width (int): The width of the map in tiles.
+            height (int): The height of the map in tiles.
+            rng (numpy.random.Generator): The random stream of this stage.
+
+        Returns:
+            numpy.ndarray: A boolean array that is True for sand cells.
+        """
+        noise = np.zeros((height, width), dtype=np.float32)
+        for scale, weight in ((self.biome_scale, 0.7), (max(self.biome_scale // 3, 1), 0.3)):
+            lattice = rng.random((height // scale + 2, width // scale + 2), dtype=np.float32)
+            y = np.arange(height, dtype=np.float32) / scale
+            x = np.arange(width, dtype=np.float32) / scale
+            y0 = y.astype(np.intp)
+            x0 = x.astype(np.intp)
+            ty = (y - y0)[:, None]
+            tx = (x - x0)[None, :]
+            top = lattice[y0][:, x0] * (1 - tx) + lattice[y0][:, x0 + 1] * tx
+            bottom = lattice[y0 + 1][:, x0] * (1 - tx) + lattice[y0 + 1][:, x0 + 1] * tx
+            noise += (top * (1 - ty) + bottom * ty) * weight
+
+        threshold = np.quantile(noise, 1 - self.sand_fraction)
+        return noise > threshold
+
+    def generate_roads(self, width, height, rng, sand=None):
+        """
+        Generate a connected road network mask.
+
+        Roads follow a lattice of rows and columns road_spacing apart. A
+        random spanning tree of the lattice keeps them connected and gives
+        bends, dead ends and junctions facing every way; loop_chance of the
+        other lattice edges are added as loops. Roads at
+        the border of the lattice run on to the edge of the map or stop.
+        Where a loop road crosses sand it may be left as a dirt track, so its
+        asphalt stops at the sand.
+
+        Args:
+            width (int): The width of the map in tiles.
+            height (int): The height of the map in tiles.
+            rng (numpy.random.Generator): The random stream of this stage.
+            sand (numpy.ndarray): A boolean array that is True for sand cells, or None.
+
+        Returns:
+            numpy.ndarray: A boolean array that is True for road cells.
+        """
+        low, high = self.road_spacing
+        roads = np.zeros((height, width), dtype=np.bool_)
+
+        def lines(length):
+            gaps = rng.integers(low, high + 1, size=length // low + 1)
+            positions = np.cumsum(gaps) - gaps[0] // 2
+            return positions[positions < length - 1]
+
+        columns = lines(width)
+        rows = lines(height)
+        if len(columns) == 0 or len(rows) == 0:
+            return roads
+
+        across, down = self.spanning_tree(len(rows), len(columns), rng)
+        across_loops = ~across & (rng.random(across.shape) < self.loop_chance)
+        down_loops = ~down & (rng.random(down.shape) < self.loop_chance)
+        across_dirt = across_loops & (rng.random(across.shape) < self.dirt_track_chance)
+        down_dirt = down_loops & (rng.random(down.shape) < self.dirt_track_chance)
+        across |= across_loops
+        down |= down_loops
+
+        # lattice edges and the roads from the border nodes to the map edge, as inclusive spans
+        row_index, column_index = np.nonzero(across)
+        lanes = [rows[row_index]]
+        starts = [columns[column_index]]
+        ends = [columns[column_index + 1]]
+        border = rng.random((2, len(rows))) < 0.5
+        lanes += [rows[border[0]], rows[border[1]]]
+        starts += [np.zeros(border[0].sum(), dtype=columns.dtype), np.full(border[1].sum(), columns[-1])]
+        ends += [np.full(border[0].sum(), columns[0]), np.full(border[1].sum(), width - 1)]
+        roads |= self.draw_spans(rows, np.concatenate(lanes), np.concatenate(starts), np.concatenate(ends), (height, width))
+
+        row_index, column_index = np.nonzero(down)
+        lanes = [columns[column_index]]
+        starts = [rows[row_index]]
+        ends = [rows[row_index + 1]]
+        border = rng.random((2, len(columns))) < 0.5
+        lanes += [columns[border[0]], columns[border[1]]]
+        starts += [np.zeros(border[0].sum(), dtype=rows.dtype), np.full(border[1].sum(), rows[-1])]
+        ends += [np.full(border[0].sum(), rows[0]), np.full(border[1].sum(), height - 1)]
+        roads |= self.draw_spans(columns, np.concatenate(lanes), np.concatenate(starts), np.concatenate(ends), (width, height)).T
+
+        if sand is not None:
+            # dirt tracks lose their asphalt on sand, but never at the junctions they connect
+            row_index, column_index = np.nonzero(across_dirt)
+            tracks = self.draw_spans(rows, rows[row_index], columns[column_index] + 1, columns[column_index + 1] - 1, (height, width))
+            row_index, column_index = np.nonzero(down_dirt)
+            tracks |= self.draw_spans(columns, columns[column_index], rows[row_index] + 1, rows[row_index + 1] - 1, (width, height)).T
+            roads &= ~(tracks & sand)
+        return roads
+
+    @staticmethod
+    def spanning_tree(rows, columns, rng):
+        """
+        Pick a random spanning tree of a rows x columns lattice.
+
+        The lattice edges are visited in random order and kept when they join
+        two separate parts (Kruskal's algorithm), so every node is reached
+        without favoring any direction.
+
+        Args:
+            rows (int): The number of lattice rows.
+            columns (int): The number of lattice columns.
+            rng (numpy.random.Generator): The random stream to draw from.
+
+        Returns:
+            tuple: The (across, down) boolean arrays of shape (rows, columns - 1) and
+            (rows - 1, columns), True for the edges east and south of each node in the tree.
+        """
+        nodes = np.arange(rows * columns).reshape(rows, columns)
+        first = np.concatenate((nodes[:, :-1].ravel(), nodes[:-1, :].ravel())).tolist()
+        second = np.concatenate((nodes[:, 1:].ravel(), nodes[1:, :].ravel())).tolist()
+        parent = list(range(rows * columns))
+        kept = np.zeros(len(first), dtype=np.bool_)
+        for edge in rng.permutation(len(first)).tolist():
+            a = first[edge]
+            while parent[a] != a:
+                parent[a] = a = parent[parent[a]]
+            b = second[edge]
+            while parent[b] != b:
+                parent[b] = b = parent[parent[b]]
+            if a != b:
+                parent[a] = b
+                kept[edge] = True
+        across_count = rows * (columns - 1)
+        return kept[:across_count].reshape(rows, columns - 1), kept[across_count:].reshape(rows - 1, columns)
+
+    @staticmethod
+    def draw_spans(lines, lanes, starts, ends, shape):
+        """
+        Rasterize inclusive spans along parallel lines into a mask.
+
+        Args:
+            lines (numpy.ndarray): The position of every line across the mask.
+            lanes (numpy.ndarray): The line position of each span.
+            starts (numpy.ndarray): The first cell of each span along its line.
+            ends (numpy.ndarray): The last cell of each span along its line.
+            shape (tuple): The (cells across, line length) shape of the mask.
+
+        Returns:
+            numpy.ndarray: A boolean array of the given shape that is True on the spans.
+        """
+        length = shape[1]
+        counts = np.zeros((len(lines), length + 1), dtype=np.int32)
+        line_index = np.searchsorted(lines, lanes)
+        np.add.at(counts, (line_index, starts), 1)
+        np.add.at(counts, (line_index, ends + 1), -1)
+        mask = np.zeros(shape, dtype=np.bool_)
+        mask[lines] = np.cumsum(counts[:, :length], axis=1) > 0
+        return mask
+
+    def auto_tile(self, sand, roads, rng):
+        """
+        Pick a tile ID for every cell from its biome and neighbor bitmask.
+
+        Road cells index a 16-entry table with their N/E/S/W road neighbors.
+        Grass cells next to sand get transition tiles, straight grass roads
+        that run into sand get road transition tiles, and grass roads that
+        end at sand get dirt track transition tiles.
+
+        Args:
+            sand (numpy.ndarray): A boolean array that is True for sand cells.
+            roads (numpy.ndarray): A boolean array that is True for road cells.
+            rng (numpy.random.Generator): The random stream of this stage.
+
+        Returns:
+            numpy.ndarray: A uint8 array of tile IDs.
+        """
+        variant = rng.random(sand.shape, dtype=np.float32) < self.variant_chance
+        tilemap = np.where(
+            sand,
+            np.where(variant, TILE_IDS["tileSand2"], TILE_IDS["tileSand1"]),
+            np.where(variant, TILE_IDS["tileGrass2"], TILE_IDS["tileGrass1"]),
+        ).astype(np.uint8)
+
+        grass = ~sand
+        sand_north, sand_east, sand_south, sand_west = _neighbors(sand)
+        plain_grass = grass & ~roads
+        for side, sand_side in (("S", sand_south), ("N", sand_north), ("E", sand_east), ("W", sand_west)):
+            tilemap[plain_grass & sand_side] = TILE_IDS[f"tileGrass_transition{side}"]
+
+        north, east, south, west = _neighbors(roads)
+        mask = (north * NORTH | east * EAST | south * SOUTH | west * WEST).astype(np.uint8)
+        grass_roads = roads & grass
+        sand_roads = roads & sand
+        tilemap[grass_roads] = GRASS_ROAD_TILES[mask[grass_roads]]
+        tilemap[sand_roads] = SAND_ROAD_TILES[mask[sand_roads]]
+
+        round_crossing = roads & (mask == (NORTH | EAST | SOUTH | WEST))
+        round_crossing &= rng.random(sand.shape, dtype=np.float32) < self.round_crossing_chance
+        tilemap[round_crossing & grass] = TILE_IDS["tileGrass_roadCrossingRound"]
+        tilemap[round_crossing & sand] = TILE_IDS["tileSand_roadCrossingRound"]
+
+        horizontal = grass_roads & (mask == (EAST | WEST))
+        vertical = grass_roads & (mask == (NORTH | SOUTH))
+        tilemap[horizontal & sand_west] = TILE_IDS["tileGrass_roadTransitionW"]
+        tilemap[horizontal & sand_east] = TILE_IDS["tileGrass_roadTransitionE"]
+        tilemap[vertical & sand_north] = TILE_IDS["tileGrass_roadTransitionN"]
+        tilemap[vertical & sand_south] = TILE_IDS["tileGrass_roadTransitionS"]
+
+        # grass roads that end where sand begins turn into a dirt track
+        for side, bit, sand_side in (("W", EAST, sand_west), ("E", WEST, sand_east), ("N", SOUTH, sand_north), ("S", NORTH, sand_south)):
+            tilemap[grass_roads & (mask == bit) & sand_side] = TILE_IDS[f"tileGrass_roadTransition{side}_dirt"]
+        return tilemap
+
+    def scatter_obstacles(self, sand, roads, rng):
+        """
+        Scatter obstacles over the cells off the road network.
+
+        Grass cells get trees and crates, sand cells get barrels, sandbags
+        and barricades.
+
+        Args:
+            sand (numpy.ndarray): A boolean array that is True for sand cells.
+            roads (numpy.ndarray): A boolean array that is True for road cells.
+            rng (numpy.random.Generator): The random stream of this stage.
+
+        Returns:
+            numpy.ndarray: A uint8 array of object IDs, with 0 meaning no obstacle.
+        """
+        placed = (rng.random(sand.shape, dtype=np.float32) < self.obstacle_density) & ~roads
+        choice = rng.integers(0, len(GRASS_OBJECTS), size=sand.shape, dtype=np.uint8)
+        objects = np.where(sand, SAND_OBJECTS[choice], GRASS_OBJECTS[choice])
+        return np.where(placed, objects, 0).astype(np.uint8)
+
+if __name__ == "__main__":
+    generator = MapGenerator(seed=1234)
+    start = time.perf_counter()
+    tilemap, obstacles = generator.generate(1000, 1000)
+    elapsed = time.perf_counter() - start
+    again, _ = MapGenerator(seed=1234).generate(1000, 1000)
+    print(f"1000x1000 map in {elapsed * 1000:.1f} ms, {len(np.unique(tilemap))} distinct tiles, "
+          f"{np.count_nonzero(obstacles)} obstacles, deterministic: {np.array_equal(tilemap, again)}")
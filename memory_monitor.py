@@ -0,0 +1,351 @@
+import os
+import sys
+import tracemalloc
+import weakref
+
+import pygame
+
+from constants import (
+    MEMORY_SNAPSHOT_INTERVAL, MEMORY_WARMUP_FRAMES, MEMORY_FRAME_BUDGET,
+    MEMORY_SURFACE_BUDGET, MEMORY_PEAK_BUDGET, MEMORY_TRACKED_FILES,
+)
+from ecs import KIND_BULLET, KIND_EXPLOSION
+
+# pygame functions and methods that return a newly created surface, by owner
+SURFACE_FACTORIES = {
+    "pygame.transform": {"scale", "scale_by", "smoothscale", "smoothscale_by", "rotate", "rotozoom", "flip", "laplacian"},
+    "pygame.image": {"load", "frombuffer", "fromstring", "frombytes"},
+    "pygame.surfarray": {"make_surface"},
+    "Surface": {"copy", "subsurface", "convert", "convert_alpha"},
+    "Font": {"render"},
+    "Renderer": {"to_surface"},
+}
+SURFACE_FACTORY_NAMES = frozenset().union(*SURFACE_FACTORIES.values())
+
+class CountedSurface(pygame.Surface):
+    """
+    A pygame.Surface that reports its construction to the running MemoryMonitor.
+
+    MemoryMonitor.start() installs it as pygame.Surface and stop() restores
+    the original, so every pygame.Surface(...) call made while diagnostics
+    run creates one of these.
+    """
+
+    monitor = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if CountedSurface.monitor is not None:
+            CountedSurface.monitor.surface_created(self)
+
+def entity_counts(store, tank_group):
+    """
+    Count the live entities of each kind.
+
+    Args:
+        store (EntityStore): The entity store.
+        tank_group (pygame.sprite.Group): The group holding the player tanks.
+
+    Returns:
+        dict: The number of "tanks", "bullets" and "explosions".
+    """
+    return {
+        "tanks": len(tank_group),
+        "bullets": len(store.query(0, KIND_BULLET)),
+        "explosions": len(store.query(0, KIND_EXPLOSION)),
+    }
+
+class MemoryMonitor():
+    """
+    A class sampling per-frame memory use while the game runs.
+
+    Every frame records the surfaces created, the transient allocation peak
+    and the live entity counts. The peak is tracemalloc's process-wide one,
+    so it includes allocations made by numpy and pygame, not just by the
+    tracked files. Every interval frames a tracemalloc snapshot
+    of the tracked source files is compared with the previous one, which
+    attributes the memory retained since then to source lines.
+
+    Surfaces are counted with a profile hook on the pygame builtins in
+    SURFACE_FACTORIES and, since constructor calls do not reach the hook,
+    by installing CountedSurface as pygame.Surface. SDL keeps pixel data
+    outside tracemalloc, so surfaces from the constructor are also tracked
+    until they are freed and the pixel memory they hold is reported next to
+    the traced memory.
+
+    Attributes:
+        interval (int): The number of frames between snapshots.
+        filters (list): The tracemalloc filters selecting the tracked files.
+        frames (int): The number of frames recorded so far.
+        frame_surfaces (int): The surfaces created during the current frame.
+        live_surfaces (int): The constructed surfaces not yet freed.
+        surface_bytes (int): The pixel memory held by the live constructed surfaces.
+        reports (list): The report of every snapshot taken so far.
+
+    Methods:
+        start():
+            Start tracing allocations and counting surfaces.
+
+        stop():
+            Stop tracing allocations and counting surfaces.
+
+        end_frame(counts):
+            Record the frame that just finished and return a report on snapshot frames.
+
+        budget_failures(warmup, frame_budget, surface_budget, peak_budget):
+            Get a message for every steady-state report over budget.
+    """
+
+    def __init__(self, interval=MEMORY_SNAPSHOT_INTERVAL, files=MEMORY_TRACKED_FILES):
+        """
+        Initialize a MemoryMonitor object.
+
+        Args:
+            interval (int): The number of frames between snapshots.
+            files (iterable): The file names whose allocations are attributed.
+        """
+        self.interval = interval
+        self.filters = []
+        for name in files:
+            self.filters.append(tracemalloc.Filter(True, name))
+            self.filters.append(tracemalloc.Filter(True, os.path.join("*", name)))
+        self.frames = 0
+        self.frame_surfaces = 0
+        self.interval_surfaces = 0
+        self.max_surfaces = 0
+        self.max_peak = 0
+        self.frame_start = 0
+        self.live_surfaces = 0
+        self.surface_bytes = 0
+        self.previous_surface_bytes = 0
+        self.surface_type = None
+        self.previous = None
+        self.reports = []
+
+    def profile(self, frame, event, arg):
+        """
+        Count surfaces created by pygame builtins; installed with sys.setprofile.
+        """
+        if event != "c_call" or getattr(arg, "__name__", None) not in SURFACE_FACTORY_NAMES:
+            return
+        owner = arg.__self__
+        owner = getattr(owner, "__name__", None) if type(owner).__name__ == "module" else type(owner).__name__
+        if arg.__name__ in SURFACE_FACTORIES.get(owner, ()):
+            self.frame_surfaces += 1
+
+    def surface_created(self, surface):
+        """
+        Count a surface built by the pygame.Surface constructor and track it until it is freed.
+
+        Args:
+            surface (CountedSurface): The new surface.
+        """
+        size = surface.get_width() * surface.get_height() * surface.get_bytesize()
+        self.frame_surfaces += 1
+        self.live_surfaces += 1
+        self.surface_bytes += size
+        weakref.finalize(surface, self.surface_freed, size)
+
+    def surface_freed(self, size):
+        """
+        Stop tracking a constructed surface that was freed.
+
+        Args:
+            size (int): The pixel memory the surface held.
+        """
+        self.live_surfaces -= 1
+        self.surface_bytes -= size
+
+    def start(self):
+        """
+        Start tracing allocations and counting surfaces.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.previous = tracemalloc.take_snapshot().filter_traces(self.filters)
+        self.frame_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self.previous_surface_bytes = self.surface_bytes
+        if self.surface_type is None:
+            self.surface_type = pygame.Surface
+            CountedSurface.monitor = self
+            pygame.Surface = CountedSurface
+        sys.setprofile(self.profile)
+
+    def stop(self):
+        """
+        Stop tracing allocations and counting surfaces.
+        """
+        sys.setprofile(None)
+        if self.surface_type is not None:
+            pygame.Surface = self.surface_type
+            CountedSurface.monitor = None
+            self.surface_type = None
+        tracemalloc.stop()
+
+    def end_frame(self, counts):
+        """
+        Record the frame that just finished and return a report on snapshot frames.
+
+        Args:
+            counts (dict): The live entity counts, as returned by entity_counts().
+
+        Returns:
+            dict: The snapshot report, or None if this frame is not a snapshot frame.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        self.max_peak = max(self.max_peak, peak - self.frame_start)
+        self.max_surfaces = max(self.max_surfaces, self.frame_surfaces)
+        self.interval_surfaces += self.frame_surfaces
+        self.frame_surfaces = 0
+        self.frames += 1
+
+        report = None
+        if self.frames % self.interval == 0:
+            report = self.snapshot(current, counts)
+
+        self.frame_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return report
+
+    def snapshot(self, traced, counts):
+        """
+        Compare a new snapshot with the previous one and build a report.
+
+        Args:
+            traced (int): The total traced memory in bytes.
+            counts (dict): The live entity counts.
+
+        Returns:
+            dict: The report, with the top source lines by retained memory.
+        """
+        sys.setprofile(None)
+        snapshot = tracemalloc.take_snapshot().filter_traces(self.filters)
+        stats = snapshot.compare_to(self.previous, "lineno")
+        self.previous = snapshot
+        sys.setprofile(self.profile)
+
+        interval = self.interval
+        lines = []
+        for stat in stats[:10]:
+            if stat.size_diff == 0:
+                break
+            frame = stat.traceback[0]
+            lines.append((
+                os.path.basename(frame.filename), frame.lineno,
+                stat.size_diff / interval, stat.count_diff / interval,
+            ))
+        report = {
+            "frame": self.frames,
+            "traced": traced,
+            "growth_per_frame": sum(stat.size_diff for stat in stats) / interval,
+            "blocks_per_frame": sum(stat.count_diff for stat in stats) / interval,
+            "surfaces_per_frame": self.interval_surfaces / interval,
+            "max_surfaces": self.max_surfaces,
+            "live_surfaces": self.live_surfaces,
+            "surface_bytes": self.surface_bytes,
+            "surface_growth_per_frame": (self.surface_bytes - self.previous_surface_bytes) / interval,
+            "max_peak": self.max_peak,
+            "entities": dict(counts),
+            "lines": lines,
+        }
+        self.reports.append(report)
+        self.previous_surface_bytes = self.surface_bytes
+        self.interval_surfaces = 0
+        self.max_surfaces = 0
+        self.max_peak = 0
+        return report
+
+    def budget_failures(self, warmup=MEMORY_WARMUP_FRAMES, frame_budget=MEMORY_FRAME_BUDGET,
+                        surface_budget=MEMORY_SURFACE_BUDGET, peak_budget=MEMORY_PEAK_BUDGET):
+        """
+        Get a message for every steady-state report over budget.
+
+        Args:
+            warmup (int): Reports up to this frame are not checked.
+            frame_budget (float): The bytes the tracked files, and separately the
+                pixels of constructed surfaces, may retain per frame.
+            surface_budget (float): The surfaces that may be created per frame.
+            peak_budget (int): The bytes the whole process may have allocated at once
+                within a single frame, above what was traced at the frame's start.
+
+        Returns:
+            list: A message per budget exceeded; empty if every budget was met.
+        """
+        failures = []
+        for report in self.reports:
+            if report["frame"] <= warmup:
+                continue
+            if report["growth_per_frame"] > frame_budget:
+                failures.append(
+                    f"frame {report['frame']}: {report['growth_per_frame']:.1f} B/frame retained "
+                    f"(budget {frame_budget} B/frame)"
+                )
+            if report["surface_growth_per_frame"] > frame_budget:
+                failures.append(
+                    f"frame {report['frame']}: {report['surface_growth_per_frame']:.1f} B/frame of surface pixels retained "
+                    f"(budget {frame_budget} B/frame)"
+                )
+            if report["surfaces_per_frame"] > surface_budget:
+                failures.append(
+                    f"frame {report['frame']}: {report['surfaces_per_frame']:.2f} surfaces/frame "
+                    f"(budget {surface_budget}/frame)"
+                )
+            if report["max_peak"] > peak_budget:
+                failures.append(
+                    f"frame {report['frame']}: process-wide peak {report['max_peak']} B above the frame's start "
+                    f"(budget {peak_budget} B/frame)"
+                )
+        return failures
+
+def format_report(report):
+    """
+    Format a snapshot report for printing.
+
+    Args:
+        report (dict): A report returned by MemoryMonitor.end_frame.
+
+    Returns:
+        str: The report as text, one source line per row.
+    """
+    entities = ", ".join(f"{name} {count}" for name, count in report["entities"].items())
+    rows = [
+        f"frame {report['frame']}: {report['traced'] / 1024:.1f} KiB traced, "
+        f"{report['growth_per_frame']:+.1f} B/frame ({report['blocks_per_frame']:+.2f} blocks/frame) retained, "
+        f"peak {report['max_peak'] / 1024:.1f} KiB/frame, "
+        f"{report['surfaces_per_frame']:.2f} surfaces/frame (max {report['max_surfaces']}), "
+        f"{report['live_surfaces']} surfaces holding {report['surface_bytes'] / 1024:.1f} KiB "
+        f"({report['surface_growth_per_frame']:+.1f} B/frame), {entities}"
+    ]
+    for filename, lineno, size, count in report["lines"]:
+        rows.append(f"    {filename}:{lineno}: {size:+.1f} B/frame, {count:+.2f} blocks/frame")
+    return "\n".join(rows)
+
+if __name__ == "__main__":
+    # Headless soak run for CI: both tanks face each other and keep firing.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from constants import TICK_DT
+    from main import Game
+
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 1800
+    game = Game()
+    game.menu_visible = False
+    tanks = sorted(game.tank_group, key=lambda tank: tank.player)
+    tanks[0].current_direction = "left"
+    tanks[1].current_direction = "right"
+
+    monitor = MemoryMonitor()
+    monitor.start()
+    for frame in range(frames):
+        for tank in tanks:
+            tank.shoot(game.store)
+        game.frame(TICK_DT)
+        report = monitor.end_frame(entity_counts(game.store, game.tank_group))
+        if report is not None:
+            print(format_report(report))
+    monitor.stop()
+
+    failures = monitor.budget_failures()
+    for failure in failures:
+        print(f"over budget: {failure}")
+    sys.exit(1 if failures else 0)
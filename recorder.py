@@ -0,0 +1,258 @@
+import collections
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+import pygame
+
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, CAPTURE_DIR, CAPTURE_FORMAT, CAPTURE_BUFFERS
+
+class FrameRecorder():
+    """
+    A class recording gameplay frames to disk on a background thread.
+
+    Each captured frame's 32-bit pixels are copied row by row into one of a
+    fixed ring of preallocated buffers and handed to a writer thread, which
+    appends them to a raw stream or saves them as a PNG file. When the
+    writer falls behind and no buffer is free, the frame is dropped instead
+    of stalling the game.
+
+    A raw recording is a single frames.raw file of consecutive frames in
+    the display's pixel layout; capture.json holds the size, the layout as
+    an ffmpeg pixel format and the number of each frame written, so dropped
+    frames can be told apart from missing ones.
+
+    Attributes:
+        size (tuple): The (width, height) of the captured frames.
+        format (str): "raw" for a stream of native 32-bit rows, "png" for a PNG sequence.
+        buffers (list): The preallocated (height, width) 32-bit frame buffers.
+        channels (tuple): The byte offsets of red, green and blue within a pixel.
+        recording (bool): Whether frames are currently captured.
+        directory (str): The directory of the current recording.
+        frame_number (int): The number of frames offered since recording started.
+        captured (int): The number of frames copied into a buffer.
+        dropped (int): The number of frames dropped because no buffer was free.
+        written (int): The number of frames the writer has saved.
+        capture_time (float): The seconds spent copying frames on the game thread.
+        write_time (float): The seconds the writer spent saving frames.
+
+    Methods:
+        start(directory):
+            Start recording into a directory.
+
+        capture(surface):
+            Copy a finished frame into a free buffer, or drop it if none is free.
+
+        stop():
+            Finish writing the queued frames and end the recording.
+
+        stats():
+            Get the capture counters and costs of the current recording.
+    """
+
+    def __init__(self, size=(SCREEN_WIDTH, SCREEN_HEIGHT), image_format=CAPTURE_FORMAT, buffer_count=CAPTURE_BUFFERS):
+        """
+        Initialize a FrameRecorder object.
+
+        The frame buffers are allocated by the first call to start().
+
+        Args:
+            size (tuple): The (width, height) of the captured frames.
+            image_format (str): "raw" for a stream of native 32-bit rows (4 bytes per pixel,
+                layout in capture.json), "png" for a PNG sequence.
+            buffer_count (int): The number of frames that can wait for the writer.
+        """
+        self.size = tuple(size)
+        self.format = image_format
+        self.buffer_count = buffer_count
+        self.buffers = []
+        self.free = collections.deque()
+        self.queued = queue.Queue()
+        self.thread = None
+        self.stream = None
+        self.recording = False
+        self.directory = None
+        self.frame_numbers = []
+        self.channels = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Reset the capture counters and costs.
+        """
+        self.frame_number = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.capture_time = 0.0
+        self.write_time = 0.0
+
+    def start(self, directory=None):
+        """
+        Start recording into a directory.
+
+        Args:
+            directory (str): The directory to write to; defaults to a new
+                timestamped directory under CAPTURE_DIR.
+        """
+        if self.recording:
+            return
+        if not self.buffers:
+            width, height = self.size
+            self.buffers = [np.empty((height, width), dtype=np.uint32) for _ in range(self.buffer_count)]
+        if directory is None:
+            directory = os.path.join(CAPTURE_DIR, time.strftime("%Y%m%d-%H%M%S"))
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.free.clear()
+        self.free.extend(range(len(self.buffers)))
+        self.frame_numbers = []
+        self.channels = None
+        self.reset_stats()
+        if self.format == "raw":
+            self.stream = open(os.path.join(directory, "frames.raw"), "wb")
+        self.thread = threading.Thread(target=self.write_frames, name="FrameRecorder", daemon=True)
+        self.thread.start()
+        self.recording = True
+
+    def capture(self, surface):
+        """
+        Copy a finished frame into a free buffer, or drop it if none is free.
+
+        Args:
+            surface (pygame.Surface): The finished frame, 32 bits per pixel.
+        """
+        if not self.recording:
+            return
+        start = time.perf_counter()
+        self.frame_number += 1
+        try:
+            index = self.free.popleft()
+        except IndexError:
+            self.dropped += 1
+            return
+
+        if self.channels is None:
+            self.channels = tuple(shift // 8 for shift in surface.get_shifts()[:3])
+        pixels = pygame.surfarray.pixels2d(surface)
+        np.copyto(self.buffers[index], pixels.T)
+        del pixels
+        self.queued.put((index, self.frame_number))
+        self.captured += 1
+        self.capture_time += time.perf_counter() - start
+
+    def write_frames(self):
+        """
+        Save queued frames until stop() is called; runs on the writer thread.
+        """
+        while True:
+            item = self.queued.get()
+            if item is None:
+                return
+            index, frame_number = item
+            start = time.perf_counter()
+            buffer = self.buffers[index]
+            if self.stream is not None:
+                self.stream.write(buffer.data)
+            else:
+                rgb = np.ascontiguousarray(buffer.view(np.uint8).reshape(buffer.shape + (4,))[..., self.channels])
+                image = pygame.image.frombuffer(rgb.data, self.size, "RGB")
+                pygame.image.save(image, os.path.join(self.directory, f"frame_{frame_number:06d}.png"))
+            self.frame_numbers.append(frame_number)
+            self.written += 1
+            self.write_time += time.perf_counter() - start
+            self.free.append(index)
+
+    def stop(self):
+        """
+        Finish writing the queued frames and end the recording.
+        """
+        if not self.recording:
+            return
+        self.recording = False
+        self.queued.put(None)
+        self.thread.join()
+        self.thread = None
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+        metadata = {
+            "width": self.size[0],
+            "height": self.size[1],
+            "format": self.format,
+            "pixel_format": self.pixel_format(),
+            "frames": self.frame_numbers,
+            "dropped": self.dropped,
+        }
+        with open(os.path.join(self.directory, "capture.json"), "w") as metadata_file:
+            json.dump(metadata, metadata_file)
+
+    def pixel_format(self):
+        """
+        Get the ffmpeg name of the captured pixel layout.
+
+        Returns:
+            str: "bgr0" or "rgb0" for the usual layouts, "rgba" if nothing was captured.
+        """
+        names = {(2, 1, 0): "bgr0", (0, 1, 2): "rgb0", (3, 2, 1): "0bgr", (1, 2, 3): "0rgb"}
+        return names.get(self.channels, "rgba")
+
+    def stats(self):
+        """
+        Get the capture counters and costs of the current recording.
+
+        Returns:
+            dict: The frames "captured", "dropped" and "written", the
+            "capture_ms" spent per captured frame on the game thread, and the
+            "write_ms" the writer spent per written frame.
+        """
+        return {
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "written": self.written,
+            "capture_ms": self.capture_time / max(self.captured, 1) * 1000,
+            "write_ms": self.write_time / max(self.written, 1) * 1000,
+        }
+
+def format_stats(stats):
+    """
+    Format capture stats for printing.
+
+    Args:
+        stats (dict): The stats returned by FrameRecorder.stats.
+
+    Returns:
+        str: The stats as a single line.
+    """
+    return (
+        f"capture: {stats['captured']} frames, {stats['dropped']} dropped, {stats['written']} written, "
+        f"{stats['capture_ms']:.3f} ms/frame on the game thread, {stats['write_ms']:.3f} ms/frame writing"
+    )
+
+if __name__ == "__main__":
+    # Measure the game-thread cost of capturing headless frames in both formats.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import tempfile
+    from constants import TICK_DT
+    from main import Game
+
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    game = Game()
+    game.menu_visible = False
+    for image_format in ("raw", "png"):
+        recorder = FrameRecorder(image_format=image_format)
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            game.recorder = recorder
+            recorder.start(directory)
+            for _ in range(frames):
+                game.frame(TICK_DT)
+            recorder.stop()
+            elapsed = time.perf_counter() - start
+        print(f"{image_format}: {elapsed / frames * 1000:.3f} ms/frame total, " + format_stats(recorder.stats()))
@@ -0,0 +1,344 @@
+import pygame
+
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, WINDOW_SCALE, VSYNC, GREEN, RED
+from systems import entity_draw_list, health_bar_rects, draw_system, health_bar_system
+
+class SurfaceRenderer():
+    """
+    A class drawing the game with software blits onto the display surface.
+
+    The frame is drawn at SCREEN_WIDTH x SCREEN_HEIGHT; when WINDOW_SCALE is
+    not 1 the window is that many times larger and SDL scales the frame to fit.
+
+    Attributes:
+        screen (pygame.Surface): The display surface everything is drawn on.
+        window (pygame._sdl2.video.Window): The scaled window, or None when WINDOW_SCALE is 1.
+        name (str): A short description of the backend.
+
+    Methods:
+        begin(color):
+            Start a frame by clearing it to a color.
+
+        blit_surface(key, surface, position, version):
+            Draw a surface that may be cached by the backend.
+
+        draw_entities(store, alpha, kind, visible):
+            Draw every entity of a kind, interpolated between the last two ticks.
+
+        draw_health_bars(store, alpha, visible):
+            Draw a health bar above every entity that has health.
+
+        draw_overlay(draw, version):
+            Draw with a function that expects a screen-sized surface.
+
+        present():
+            Show the finished frame.
+
+        read_pixels():
+            Get the finished frame as a surface.
+    """
+
+    def __init__(self, caption):
+        """
+        Initialize a SurfaceRenderer object and open the window.
+
+        Args:
+            caption (str): The window caption.
+        """
+        flags = 0
+        if VSYNC or WINDOW_SCALE != 1:
+            flags = pygame.SCALED
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags, vsync=int(VSYNC))
+        self.window = None
+        if WINDOW_SCALE != 1:
+            # SCALED keeps the logical size and stretches it over whatever size the window has;
+            # window events refer to this object, so it must outlive the display
+            from pygame._sdl2.video import Window
+
+            self.window = Window.from_display_module()
+            self.window.size = (int(SCREEN_WIDTH * WINDOW_SCALE), int(SCREEN_HEIGHT * WINDOW_SCALE))
+        pygame.display.set_caption(caption)
+        self.name = "software"
+
+    def begin(self, color):
+        """
+        Start a frame by clearing it to a color.
+
+        Args:
+            color (tuple): The RGB clear color.
+        """
+        self.screen.fill(color)
+
+    def blit_surface(self, key, surface, position, version=None):
+        """
+        Draw a surface that may be cached by the backend.
+
+        Args:
+            key (hashable): A stable identifier of the surface.
+            surface (pygame.Surface): The surface to draw.
+            position (tuple): The top-left corner to draw at.
+            version (hashable): A value that changes whenever the surface content changes.
+        """
+        self.screen.blit(surface, position)
+
+    def draw_entities(self, store, alpha, kind, visible=None):
+        """
+        Draw every entity of a kind, interpolated between the last two ticks.
+
+        Args:
+            store (EntityStore): The entity store.
+            alpha (float): How far the render time is between the previous and current tick.
+            kind (int): The kind of entity to draw.
+            visible (numpy.ndarray): A 2D boolean tile grid; entities on hidden tiles are skipped.
+        """
+        draw_system(store, self.screen, alpha, kind, visible)
+
+    def draw_health_bars(self, store, alpha, visible=None):
+        """
+        Draw a health bar above every entity that has health.
+
+        Args:
+            store (EntityStore): The entity store.
+            alpha (float): How far the render time is between the previous and current tick.
+            visible (numpy.ndarray): A 2D boolean tile grid; entities on hidden tiles are skipped.
+        """
+        health_bar_system(store, self.screen, alpha, visible=visible)
+
+    def draw_overlay(self, draw, version=None):
+        """
+        Draw with a function that expects a screen-sized surface.
+
+        Args:
+            draw (callable): A function taking the surface to draw on.
+            version (hashable): A value that changes whenever the overlay content changes.
+        """
+        draw(self.screen)
+
+    def present(self):
+        """
+        Show the finished frame.
+        """
+        pygame.display.flip()
+
+    def read_pixels(self):
+        """
+        Get the finished frame as a surface.
+
+        Returns:
+            pygame.Surface: The display surface.
+        """
+        return self.screen
+
+class TextureRenderer():
+    """
+    A class drawing the game with an SDL renderer and GPU textures.
+
+    Sprites, terrain chunks and overlays are uploaded as textures once and
+    re-uploaded only when their version changes; drawing is done with
+    renderer copies, which scale and rotate on the GPU when one is present.
+    The frame is drawn at SCREEN_WIDTH x SCREEN_HEIGHT and scaled to the
+    window by the renderer. SDL's software renderer is used when no
+    accelerated renderer is available, for example on headless machines.
+
+    Attributes:
+        window (pygame._sdl2.video.Window): The game window.
+        renderer (pygame._sdl2.video.Renderer): The SDL renderer.
+        accelerated (bool): Whether the renderer is hardware accelerated.
+        name (str): A short description of the backend.
+        textures (dict): Uploaded textures and their versions, keyed by blit_surface key.
+        sprite_textures (list): Uploaded store sprites, one list of frame textures per sprite id.
+        overlay_texture (pygame._sdl2.video.Texture): The streaming texture draw_overlay draws into.
+        pixels (pygame.Surface): The surface read_pixels reads the frame back into.
+        window_pixels (pygame.Surface): The window-sized read-back surface used when WINDOW_SCALE is not 1.
+
+    Methods:
+        begin(color):
+            Start a frame by clearing it to a color.
+
+        blit_surface(key, surface, position, version):
+            Draw a surface, uploading it as a texture only when its version changes.
+
+        draw_entities(store, alpha, kind, visible):
+            Draw every entity of a kind, interpolated between the last two ticks.
+
+        draw_health_bars(store, alpha, visible):
+            Draw a health bar above every entity that has health.
+
+        draw_overlay(draw, version):
+            Draw with a function that expects a screen-sized surface.
+
+        present():
+            Show the finished frame.
+
+        read_pixels():
+            Get the finished frame as a surface.
+    """
+
+    def __init__(self, caption):
+        """
+        Initialize a TextureRenderer object and open the window.
+
+        Args:
+            caption (str): The window caption.
+        """
+        from pygame._sdl2.video import Window, Renderer
+
+        size = (int(SCREEN_WIDTH * WINDOW_SCALE), int(SCREEN_HEIGHT * WINDOW_SCALE))
+        self.window = Window(caption, size=size)
+        try:
+            self.renderer = Renderer(self.window, accelerated=1, vsync=VSYNC)
+            self.accelerated = True
+        except RuntimeError:
+            # pygame._sdl2 raises its own error type, a RuntimeError subclass
+            self.renderer = Renderer(self.window, accelerated=0)
+            self.accelerated = False
+        self.renderer.logical_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.name = "texture (accelerated)" if self.accelerated else "texture (software)"
+        self.textures = {}
+        self.sprite_textures = []
+        self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.overlay_texture = None
+        self.overlay_version = None
+        self.pixels = None
+        self.window_pixels = None
+
+    def texture(self, surface):
+        """
+        Upload a surface as a texture.
+
+        Args:
+            surface (pygame.Surface): The surface to upload.
+
+        Returns:
+            pygame._sdl2.video.Texture: The uploaded texture.
+        """
+        from pygame._sdl2.video import Texture
+
+        return Texture.from_surface(self.renderer, surface)
+
+    def begin(self, color):
+        """
+        Start a frame by clearing it to a color.
+
+        Args:
+            color (tuple): The RGB clear color.
+        """
+        self.renderer.draw_color = (*color, 255)
+        self.renderer.clear()
+
+    def blit_surface(self, key, surface, position, version=None):
+        """
+        Draw a surface, uploading it as a texture only when its version changes.
+
+        Args:
+            key (hashable): A stable identifier of the surface.
+            surface (pygame.Surface): The surface to draw.
+            position (tuple): The top-left corner to draw at.
+            version (hashable): A value that changes whenever the surface content changes.
+        """
+        cached = self.textures.get(key)
+        if cached is None or cached[1] != version or cached[0].width != surface.get_width() or cached[0].height != surface.get_height():
+            cached = (self.texture(surface), version)
+            self.textures[key] = cached
+        texture = cached[0]
+        texture.draw(dstrect=(position[0], position[1], texture.width, texture.height))
+
+    def draw_entities(self, store, alpha, kind, visible=None):
+        """
+        Draw every entity of a kind, interpolated between the last two ticks.
+
+        Args:
+            store (EntityStore): The entity store.
+            alpha (float): How far the render time is between the previous and current tick.
+            kind (int): The kind of entity to draw.
+            visible (numpy.ndarray): A 2D boolean tile grid; entities on hidden tiles are skipped.
+        """
+        for sprite in range(len(self.sprite_textures), len(store.sprites)):
+            self.sprite_textures.append([self.texture(frame) for frame in store.sprites[sprite]])
+        textures = self.sprite_textures
+        for sprite, frame, left, top, width, height in entity_draw_list(store, alpha, kind, visible):
+            textures[sprite][frame].draw(dstrect=(left, top, width, height))
+
+    def draw_health_bars(self, store, alpha, visible=None):
+        """
+        Draw a health bar above every entity that has health.
+
+        Args:
+            store (EntityStore): The entity store.
+            alpha (float): How far the render time is between the previous and current tick.
+            visible (numpy.ndarray): A 2D boolean tile grid; entities on hidden tiles are skipped.
+        """
+        renderer = self.renderer
+        for background, bar in health_bar_rects(store, alpha, visible):
+            renderer.draw_color = (*RED, 255)
+            renderer.fill_rect(background)
+            if bar[2] > 0:
+                renderer.draw_color = (*GREEN, 255)
+                renderer.fill_rect(bar)
+
+    def draw_overlay(self, draw, version=None):
+        """
+        Draw with a function that expects a screen-sized surface.
+
+        The function draws onto a transparent surface, which is copied into a
+        single streaming texture drawn over the frame. When a version is given
+        the function is only called, and the texture only updated, when the
+        version changes.
+
+        Args:
+            draw (callable): A function taking the surface to draw on.
+            version (hashable): A value that changes whenever the overlay content changes.
+        """
+        from pygame._sdl2.video import Texture
+
+        if self.overlay_texture is None:
+            self.overlay_texture = Texture(self.renderer, (SCREEN_WIDTH, SCREEN_HEIGHT), streaming=True)
+            self.overlay_texture.blend_mode = 1  # SDL_BLENDMODE_BLEND
+        if version is None or version != self.overlay_version:
+            self.overlay.fill((0, 0, 0, 0))
+            draw(self.overlay)
+            self.overlay_texture.update(self.overlay)
+            self.overlay_version = version
+        self.overlay_texture.draw(dstrect=(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    def present(self):
+        """
+        Show the finished frame.
+        """
+        self.renderer.present()
+
+    def read_pixels(self):
+        """
+        Get the finished frame as a surface.
+
+        Must be called before present(). When the window is scaled the
+        frame is read at window size and scaled back to SCREEN_WIDTH x SCREEN_HEIGHT.
+
+        Returns:
+            pygame.Surface: The frame read back from the renderer, into a surface reused between calls.
+        """
+        if self.pixels is None:
+            self.pixels = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), 0, 32)
+        size = self.window.size
+        if size == (SCREEN_WIDTH, SCREEN_HEIGHT):
+            return self.renderer.to_surface(self.pixels)
+        # read-back is in window pixels even with a logical size set
+        if self.window_pixels is None or self.window_pixels.get_size() != size:
+            self.window_pixels = pygame.Surface(size, 0, 32)
+        self.renderer.to_surface(self.window_pixels)
+        return pygame.transform.scale(self.window_pixels, (SCREEN_WIDTH, SCREEN_HEIGHT), self.pixels)
+
+def create_renderer(backend, caption):
+    """
+    Create the renderer backend selected by name.
+
+    Args:
+        backend (str): "texture" for the SDL renderer, anything else for software blits.
+        caption (str): The window caption.
+
+    Returns:
+        SurfaceRenderer or TextureRenderer: The renderer backend.
+    """
+    if backend == "texture":
+        return TextureRenderer(caption)
+    return SurfaceRenderer(caption)
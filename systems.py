@@ -0,0 +1,409 @@
+import time
+import numpy as np
+import pygame
+
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, TILE_SIZE, BULLET_SPEED, EXPLOSION_FRAME_TIME, GREEN, RED
+from ecs import (
+    EntityStore, KIND_TANK, KIND_BULLET, KIND_EXPLOSION,
+    TRANSFORM, VELOCITY, HEALTH, OWNER, COOLDOWN, SPRITE,
+    DIRECTION_INDEX, DIRECTION_VECTORS,
+)
+
+def spawn_bullet(store, x, y, direction, owner, sprite, size):
+    """
+    Create a bullet entity.
+
+    Args:
+        store (EntityStore): The store to create the bullet in.
+        x (float): The X-coordinate of the bullet's center.
+        y (float): The Y-coordinate of the bullet's center.
+        direction (str): The direction the bullet travels in.
+        owner (int): The player number of the tank that fired it.
+        sprite (int): The id of the bullet sprite, with one frame per direction.
+        size (tuple): The (width, height) of the bullet.
+
+    Returns:
+        int: The id of the new bullet entity.
+    """
+    index = DIRECTION_INDEX[direction]
+    vx, vy = DIRECTION_VECTORS[index] * BULLET_SPEED
+    return store.create(
+        KIND_BULLET, TRANSFORM | VELOCITY | OWNER | SPRITE,
+        x=x, y=y, prev_x=x, prev_y=y, direction=index,
+        vx=vx, vy=vy, owner=owner,
+        sprite=sprite, frame=index, width=size[0], height=size[1],
+    )
+
+def spawn_explosion(store, x, y, sprite, size):
+    """
+    Create an explosion entity.
+
+    Args:
+        store (EntityStore): The store to create the explosion in.
+        x (float): The X-coordinate of the explosion's center.
+        y (float): The Y-coordinate of the explosion's center.
+        sprite (int): The id of the explosion sprite, with one frame per animation step.
+        size (tuple): The (width, height) of the explosion.
+
+    Returns:
+        int: The id of the new explosion entity.
+    """
+    return store.create(
+        KIND_EXPLOSION, TRANSFORM | SPRITE,
+        x=x, y=y, prev_x=x, prev_y=y,
+        sprite=sprite, width=size[0], height=size[1],
+    )
+
+def movement_system(store, dt):
+    """
+    Start a simulation tick: remember every position, then move every entity that has a velocity.
+
+    Args:
+        store (EntityStore): The entity store.
+        dt (float): The length of the simulation tick in seconds.
+    """
+    count = store.count
+    store.prev_x[:count] = store.x[:count]
+    store.prev_y[:count] = store.y[:count]
+    ids = store.query(TRANSFORM | VELOCITY)
+    store.x[ids] += store.vx[ids] * dt
+    store.y[ids] += store.vy[ids] * dt
+
+def cooldown_system(store, dt):
+    """
+    Count down every shooting cooldown by one simulation tick.
+
+    Args:
+        store (EntityStore): The entity store.
+        dt (float): The length of the simulation tick in seconds.
+    """
+    ids = store.query(COOLDOWN)
+    store.cooldown[ids] = np.maximum(store.cooldown[ids] - dt * 1000, 0)
+
+def bounds_system(store):
+    """
+    Destroy every bullet that has left the screen.
+
+    Args:
+        store (EntityStore): The entity store.
+    """
+    ids = store.query(TRANSFORM | SPRITE, KIND_BULLET)
+    half_width = store.width[ids] / 2
+    half_height = store.height[ids] / 2
+    x = store.x[ids]
+    y = store.y[ids]
+    outside = (
+        (x - half_width < 0)
+        | (x + half_width > SCREEN_WIDTH)
+        | (y - half_height < 0)
+        | (y + half_height > SCREEN_HEIGHT)
+    )
+    store.destroy_many(ids[outside])
+
+def bullet_collision_system(store):
+    """
+    Cancel out bullets that collide with each other.
+
+    Bullets are sorted by X and compared against their k-th neighbour for
+    increasing k until no neighbour is close enough on the X axis, so the
+    cost grows with bullet density rather than with the square of the count.
+    Overlapping pairs are resolved in order of their entity ids, each bullet
+    cancelling at most one other; a pair is taken in bulk as soon as no
+    earlier pair shares a bullet with it.
+
+    Args:
+        store (EntityStore): The entity store.
+
+    Returns:
+        list: An (x, y, owner) tuple for each cancelled bullet, with its center and the player who fired it.
+    """
+    ids = store.query(TRANSFORM | SPRITE, KIND_BULLET)
+    if len(ids) < 2:
+        return []
+
+    order = ids[np.argsort(store.x[ids], kind="stable")]
+    x = store.x[order]
+    y = store.y[order]
+    half_width = store.width[order] / 2
+    half_height = store.height[order] / 2
+    reach = 2 * half_width.max()
+
+    firsts = []
+    seconds = []
+    for k in range(1, len(order)):
+        dx = x[k:] - x[:-k]
+        if not (dx < reach).any():
+            break
+        hit = np.flatnonzero(
+            (dx < half_width[k:] + half_width[:-k])
+            & (np.abs(y[k:] - y[:-k]) < half_height[k:] + half_height[:-k])
+        )
+        firsts.append(order[hit])
+        seconds.append(order[hit + k])
+    if not firsts:
+        return []
+    first = np.concatenate(firsts)
+    second = np.concatenate(seconds)
+    if len(first) == 0:
+        return []
+
+    # rank pairs by (first, second) and accept every pair that is the
+    # earliest remaining one for both of its bullets, until none are left
+    rank_order = np.argsort(first.astype(np.int64) * store.count + second)
+    first = first[rank_order]
+    second = second[rank_order]
+    rank = np.arange(len(first))
+    used = np.zeros(store.count, dtype=np.bool_)
+    earliest = np.empty(store.count, dtype=np.intp)
+    while len(rank):
+        earliest.fill(len(rank_order))
+        np.minimum.at(earliest, np.concatenate((first, second)), np.concatenate((rank, rank)))
+        accepted = (earliest[first] == rank) & (earliest[second] == rank)
+        used[first[accepted]] = True
+        used[second[accepted]] = True
+        remaining = ~(used[first] | used[second])
+        first = first[remaining]
+        second = second[remaining]
+        rank = rank[remaining]
+
+    cancelled_ids = np.flatnonzero(used)
+    cancelled = list(zip(
+        store.x[cancelled_ids].tolist(), store.y[cancelled_ids].tolist(), store.owner[cancelled_ids].tolist(),
+    ))
+    store.destroy_many(cancelled_ids)
+    return cancelled
+
+def bullet_hit_system(store, damage):
+    """
+    Apply damage to tanks hit by an opponent's bullet and destroy those bullets.
+
+    Args:
+        store (EntityStore): The entity store.
+        damage (int): The health removed from a tank per hit.
+
+    Returns:
+        list: An (x, y, tank, owner, health) tuple for each hit, with the bullet's center, the
+        tank's entity id, the player who fired the bullet and the tank's health after that hit.
+    """
+    bullets = store.query(TRANSFORM | OWNER | SPRITE, KIND_BULLET)
+    tanks = store.query(TRANSFORM | HEALTH | OWNER | SPRITE, KIND_TANK)
+    hits = []
+    for tank in tanks.tolist():
+        if len(bullets) == 0:
+            break
+        hit = (
+            (np.abs(store.x[bullets] - store.x[tank]) < (store.width[bullets] + store.width[tank]) / 2)
+            & (np.abs(store.y[bullets] - store.y[tank]) < (store.height[bullets] + store.height[tank]) / 2)
+            & (store.owner[bullets] != store.owner[tank])
+        )
+        hit_ids = bullets[hit]
+        if len(hit_ids):
+            health = int(store.health[tank])
+            for bullet in hit_ids.tolist():
+                health -= damage
+                hits.append((float(store.x[bullet]), float(store.y[bullet]), tank, int(store.owner[bullet]), health))
+            store.health[tank] = health
+            store.destroy_many(hit_ids)
+            bullets = bullets[~hit]
+    return hits
+
+def bullet_obstacle_system(store, solid):
+    """
+    Destroy every bullet whose center is on a solid tile.
+
+    Args:
+        store (EntityStore): The entity store.
+        solid (numpy.ndarray): A 2D boolean tile grid that is True for tiles that stop bullets.
+
+    Returns:
+        list: An (x, y, row, col) tuple for each stopped bullet, with its center and tile.
+    """
+    ids = store.query(TRANSFORM, KIND_BULLET)
+    if len(ids) == 0:
+        return []
+    rows, columns = solid.shape
+    tile_rows = (store.y[ids] // TILE_SIZE).astype(np.intp)
+    tile_columns = (store.x[ids] // TILE_SIZE).astype(np.intp)
+    inside = (tile_rows >= 0) & (tile_rows < rows) & (tile_columns >= 0) & (tile_columns < columns)
+    hit = np.zeros(len(ids), dtype=np.bool_)
+    hit[inside] = solid[tile_rows[inside], tile_columns[inside]]
+    hit_ids = ids[hit]
+    hits = list(zip(
+        store.x[hit_ids].tolist(), store.y[hit_ids].tolist(),
+        tile_rows[hit].tolist(), tile_columns[hit].tolist(),
+    ))
+    store.destroy_many(hit_ids)
+    return hits
+
+def explosion_system(store, dt):
+    """
+    Advance every explosion animation and destroy the finished ones.
+
+    Args:
+        store (EntityStore): The entity store.
+        dt (float): The length of the simulation tick in seconds.
+    """
+    ids = store.query(SPRITE, KIND_EXPLOSION)
+    store.frame_time[ids] += dt
+    step = store.frame_time[ids] >= EXPLOSION_FRAME_TIME
+    stepped = ids[step]
+    store.frame[stepped] += 1
+    store.frame_time[stepped] -= EXPLOSION_FRAME_TIME
+    finished = store.frame[ids] >= store.sprite_frame_counts[store.sprite[ids]]
+    store.destroy_many(ids[finished])
+
+def visible_entities(store, ids, visible):
+    """
+    Filter entity ids down to those standing on a visible tile.
+
+    Args:
+        store (EntityStore): The entity store.
+        ids (numpy.ndarray): The entity ids to filter.
+        visible (numpy.ndarray): A 2D boolean tile grid, or None to keep every entity.
+
+    Returns:
+        numpy.ndarray: The ids of the entities on visible tiles.
+    """
+    if visible is None or len(ids) == 0:
+        return ids
+    rows, columns = visible.shape
+    tile_rows = np.clip((store.y[ids] // TILE_SIZE).astype(np.intp), 0, rows - 1)
+    tile_columns = np.clip((store.x[ids] // TILE_SIZE).astype(np.intp), 0, columns - 1)
+    return ids[visible[tile_rows, tile_columns]]
+
+def entity_draw_list(store, alpha, kind, visible=None):
+    """
+    Get where to draw every entity of a kind, interpolated between the last two ticks.
+
+    Args:
+        store (EntityStore): The entity store.
+        alpha (float): How far the render time is between the previous and current tick.
+        kind (int): The kind of entity to draw.
+        visible (numpy.ndarray): A 2D boolean tile grid; entities on hidden tiles are skipped.
+
+    Returns:
+        list: A (sprite, frame, left, top, width, height) tuple per entity.
+    """
+    ids = visible_entities(store, store.query(TRANSFORM | SPRITE, kind), visible)
+    if len(ids) == 0:
+        return []
+    x = store.prev_x[ids] + (store.x[ids] - store.prev_x[ids]) * alpha - store.width[ids] / 2
+    y = store.prev_y[ids] + (store.y[ids] - store.prev_y[ids]) * alpha - store.height[ids] / 2
+    return list(zip(
+        store.sprite[ids].tolist(), store.frame[ids].tolist(),
+        np.rint(x).astype(np.int32).tolist(), np.rint(y).astype(np.int32).tolist(),
+        store.width[ids].tolist(), store.height[ids].tolist(),
+    ))
+
+def draw_system(store, screen, alpha, kind, visible=None):
+    """
+    Draw every entity of a kind, interpolated between the last two ticks.
+
+    Args:
+        store (EntityStore): The entity store.
+        screen (pygame.Surface): The Pygame surface on which to draw.
+        alpha (float): How far the render time is between the previous and current tick.
+        kind (int): The kind of entity to draw.
+        visible (numpy.ndarray): A 2D boolean tile grid; entities on hidden tiles are skipped.
+    """
+    sprites = store.sprites
+    screen.blits(
+        [(sprites[sprite][frame], (left, top)) for sprite, frame, left, top, _, _ in entity_draw_list(store, alpha, kind, visible)],
+        doreturn=False,
+    )
+
+def health_bar_rects(store, alpha, visible=None, height=2):
+    """
+    Get the rectangles of the health bar above every entity that has health.
+
+    Args:
+        store (EntityStore): The entity store.
+        alpha (float): How far the render time is between the previous and current tick.
+        visible (numpy.ndarray): A 2D boolean tile grid; entities on hidden tiles are skipped.
+        height (int): The height of the health bars.
+
+    Returns:
+        list: A (background, bar) pair of (left, top, width, height) tuples per entity.
+    """
+    ids = visible_entities(store, store.query(TRANSFORM | HEALTH | SPRITE), visible)
+    if len(ids) == 0:
+        return []
+    width = store.width[ids]
+    x = np.rint(store.prev_x[ids] + (store.x[ids] - store.prev_x[ids]) * alpha - width / 2).astype(np.int32)
+    y = np.rint(store.prev_y[ids] + (store.y[ids] - store.prev_y[ids]) * alpha - store.height[ids] / 2 - 10).astype(np.int32)
+    fill = (np.clip(store.health[ids] / store.max_health[ids], 0, 1) * width).astype(np.int32)
+    return [
+        ((left, top, bar_width, height), (left, top, bar_fill, height))
+        for left, top, bar_width, bar_fill in zip(x.tolist(), y.tolist(), width.tolist(), fill.tolist())
+    ]
+
+def health_bar_system(store, screen, alpha, height=2, visible=None):
+    """
+    Draw a health bar above every entity that has health.
+
+    Args:
+        store (EntityStore): The entity store.
+        screen (pygame.Surface): The Pygame surface on which to draw.
+        alpha (float): How far the render time is between the previous and current tick.
+        height (int): The height of the health bars.
+        visible (numpy.ndarray): A 2D boolean tile grid; entities on hidden tiles are skipped.
+    """
+    for background, bar in health_bar_rects(store, alpha, visible, height):
+        screen.fill(RED, background)
+        screen.fill(GREEN, bar)
+
+def benchmark(entity_count=5000, ticks=200):
+    """
+    Measure per-entity memory and per-tick cost of the simulation systems.
+
+    Args:
+        entity_count (int): The number of bullets to simulate.
+        ticks (int): The number of ticks to average over.
+
+    Returns:
+        dict: The memory report plus "tick_ms" and "tick_us_per_entity".
+    """
+    store = EntityStore(entity_count + 2)
+    sprite = store.register_sprite("bullet", [pygame.Surface((1, 1))] * 4)
+    rng = np.random.default_rng(0)
+    directions = ("up", "down", "left", "right")
+    for player in (1, 2):
+        store.create(
+            KIND_TANK, TRANSFORM | HEALTH | OWNER | COOLDOWN | SPRITE,
+            x=SCREEN_WIDTH * player / 3, y=SCREEN_HEIGHT / 2,
+            health=10 ** 4, max_health=10 ** 4, owner=player, width=40, height=40,
+        )
+
+    def refill():
+        missing = entity_count - len(store.query(0, KIND_BULLET))
+        for _ in range(missing):
+            spawn_bullet(
+                store, rng.uniform(20, SCREEN_WIDTH - 20), rng.uniform(20, SCREEN_HEIGHT - 20),
+                directions[rng.integers(4)], int(rng.integers(1, 3)), sprite, (10, 20),
+            )
+
+    dt = 1 / 60
+    elapsed = 0.0
+    for _ in range(ticks):
+        refill()
+        start = time.perf_counter()
+        movement_system(store, dt)
+        cooldown_system(store, dt)
+        bounds_system(store)
+        bullet_collision_system(store)
+        bullet_hit_system(store, 10)
+        explosion_system(store, dt)
+        elapsed += time.perf_counter() - start
+
+    report = store.memory_report()
+    report["tick_ms"] = elapsed / ticks * 1000
+    report["tick_us_per_entity"] = elapsed / ticks / (entity_count + 2) * 10 ** 6
+    return report
+
+if __name__ == "__main__":
+    for count in (100, 1000, 5000):
+        result = benchmark(count)
+        print(
+            f"{count:>6} entities: {result['total']} B/entity, "
+            f"{result['tick_ms']:.3f} ms/tick, {result['tick_us_per_entity']:.3f} us/entity"
+        )
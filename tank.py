@@ -1,24 +1,173 @@
 import pygame
 from helpers import load_png
-from constants import NORMAL_TANK_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT
-from bullet import Bullet
+from constants import NORMAL_TANK_SIZE, NORMAL_VERTICAL_BULLET_SIZE, NORMAL_HORIZONTAL_BULLET_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT
+from bullet import Bullet, load_bullet_images
 from health_bar import HealthBar
+from ecs import EntityStore, KIND_TANK, TRANSFORM, HEALTH, OWNER, COOLDOWN, SPRITE, DIRECTIONS, DIRECTION_INDEX
+from systems import spawn_bullet
+from telemetry import EVENT_SHOT
+
+class EntityVector():
+    """
+    A 2D vector view onto two component fields of an entity.
+
+    Reads and writes go straight to the store, so in-place updates such as
+    pos.x += 1, pos.update(x, y) or pos += offset change the entity, and
+    the changed callback runs after every write.
+    Arithmetic returns plain pygame.math.Vector2 objects.
+
+    Attributes:
+        store (EntityStore): The store holding the entity.
+        entity (int): The id of the entity.
+        changed (callable): A function called without arguments after every write, or None.
+        x (float): The first component.
+        y (float): The second component.
+
+    Methods:
+        update(x, y):
+            Set both components, from two numbers or from a pair.
+
+        lerp(other, t):
+            Get the linear interpolation towards another vector.
+
+        copy():
+            Get the current value as a pygame.math.Vector2.
+    """
+
+    __slots__ = ("store", "entity", "x_field", "y_field", "changed")
+
+    def __init__(self, store, entity, x_field, y_field, changed=None):
+        """
+        Initialize an EntityVector object.
+
+        Args:
+            store (EntityStore): The store holding the entity.
+            entity (int): The id of the entity.
+            x_field (str): The name of the field holding the first component.
+            y_field (str): The name of the field holding the second component.
+            changed (callable): A function called without arguments after every write.
+        """
+        self.store = store
+        self.entity = entity
+        self.x_field = x_field
+        self.y_field = y_field
+        self.changed = changed
+
+    @property
+    def x(self):
+        return float(getattr(self.store, self.x_field)[self.entity])
+
+    @x.setter
+    def x(self, value):
+        getattr(self.store, self.x_field)[self.entity] = value
+        if self.changed is not None:
+            self.changed()
+
+    @property
+    def y(self):
+        return float(getattr(self.store, self.y_field)[self.entity])
+
+    @y.setter
+    def y(self, value):
+        getattr(self.store, self.y_field)[self.entity] = value
+        if self.changed is not None:
+            self.changed()
+
+    def update(self, x, y=None):
+        """
+        Set both components, from two numbers or from a pair.
+
+        Args:
+            x (float or sequence): The first component, or an (x, y) pair.
+            y (float): The second component if x is a number.
+        """
+        if y is None:
+            x, y = x
+        getattr(self.store, self.x_field)[self.entity] = x
+        getattr(self.store, self.y_field)[self.entity] = y
+        if self.changed is not None:
+            self.changed()
+
+    def copy(self):
+        """
+        Get the current value as a pygame.math.Vector2.
+
+        Returns:
+            pygame.math.Vector2: A copy of the vector.
+        """
+        return pygame.math.Vector2(self.x, self.y)
+
+    def lerp(self, other, t):
+        """
+        Get the linear interpolation towards another vector.
+
+        Args:
+            other (sequence): The vector to interpolate towards.
+            t (float): The interpolation factor in [0, 1].
+
+        Returns:
+            pygame.math.Vector2: The interpolated vector.
+        """
+        return self.copy().lerp(pygame.math.Vector2(other), t)
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __eq__(self, other):
+        return self.copy() == other
+
+    def __add__(self, other):
+        return self.copy() + other
+
+    def __sub__(self, other):
+        return self.copy() - other
+
+    def __mul__(self, other):
+        return self.copy() * other
+
+    def __iadd__(self, other):
+        self.update(self.copy() + other)
+        return self
+
+    def __isub__(self, other):
+        self.update(self.copy() - other)
+        return self
+
+    def __repr__(self):
+        return f"EntityVector({self.x}, {self.y})"
 
 class Tank(pygame.sprite.Sprite):
     """
     A class representing a tank in a Pygame-based game.
 
+    The tank's position, health and cooldown live in an EntityStore as a
+    KIND_TANK entity, so the systems can process tanks in bulk. The attributes
+    below are views onto that entity and keep the object API working.
+
     Attributes:
+        store (EntityStore): The entity store backing the tank.
+        entity (int): The tank's entity id in the store.
         images (dict): Dictionary containing tank images for different directions.
         current_direction (str): The current direction of the tank.
         image (pygame.Surface): The current tank image.
         rect (pygame.Rect): The tank's rectangular boundary.
-        speed (int): The tank's movement speed.
+        pos (EntityVector): The tank's center position at the current tick; writes also move rect.
+        prev_pos (EntityVector): The tank's center position at the previous tick.
+        speed (int): The tank's movement speed in pixels per second.
         player (int): The player number (1 or 2).
         health (int): The tank's health points.
         lives (int): The number of lives remaining.
+        shots_fired (int): The number of bullets the tank has fired.
+        telemetry (TelemetryStream): The stream every shot is recorded to, or None.
         shoot_cooldown (int): The cooldown time between shots in milliseconds.
-        last_shot_time (int): The timestamp of the last shot.
+        cooldown_remaining (float): The time in milliseconds until the tank can shoot again.
         health_bar (HealthBar): The tank's health bar.
 
     Methods:
@@ -34,10 +183,13 @@ class Tank(pygame.sprite.Sprite):
         shoot(bullets):
             Fire a bullet from the tank's current position and direction.
 
-        move(direction):
+        move(direction, dt):
             Move the tank in the specified direction.
 
-        event_handler(bullets):
+        sync_rect():
+            Snap the tank's rect to its current position.
+
+        event_handler(bullets, dt):
             Handle user input for tank movement and shooting.
 
         reduce_health(amount):
@@ -46,14 +198,14 @@ class Tank(pygame.sprite.Sprite):
         handle_collision(other_tank):
             Handle a collision with another tank, separating them.
 
-        draw(image, screen):
-            Draw the tank's image on the screen.
+        draw(screen, alpha):
+            Draw the tank and its health bar, interpolated between the last two ticks.
 
-        update(screen, bullets):
-            Update the tank's state, handle input, and draw it on the screen.
+        update(dt, bullets):
+            Advance the tank's state by one simulation tick.
     """
 
-    def __init__(self, x, y, player, tank_type):
+    def __init__(self, x, y, player, tank_type, store=None):
         """
         Initialize a Tank object.
 
@@ -62,6 +214,7 @@ class Tank(pygame.sprite.Sprite):
             y (int): The initial Y-coordinate of the tank.
             player (int): The player number (1 or 2).
             tank_type (str): The type of tank (e.g., "blue" or "red").
+            store (EntityStore): The store to create the tank in. A private store is used if omitted.
         """
         super().__init__()
         category = "tanks"
@@ -73,21 +226,98 @@ class Tank(pygame.sprite.Sprite):
         }
 
         if player == 1:
-            self.current_direction = "left"
+            direction = "left"
         else:
-            self.current_direction = "right"
-
-        self.image, self.rect = self.images[self.current_direction]
+            direction = "right"
+
+        self.store = store if store is not None else EntityStore(1)
+        sprite = self.store.register_sprite(tank_type, [self.images[name][0] for name in DIRECTIONS])
+        self.entity = self.store.create(
+            KIND_TANK, TRANSFORM | HEALTH | OWNER | COOLDOWN | SPRITE,
+            x=x, y=y, prev_x=x, prev_y=y, direction=DIRECTION_INDEX[direction],
+            health=50, max_health=50, owner=player,
+            sprite=sprite, frame=DIRECTION_INDEX[direction],
+            width=NORMAL_TANK_SIZE[0], height=NORMAL_TANK_SIZE[1],
+        )
+
+        self.rect = self.images[direction][1].copy()
         self.rect.center = (x, y)
-        self.speed = 3
+        self.speed = 180
         self.player = player
-        self.health = 50
         self.lives = 3
+        self.shots_fired = 0
+        self.telemetry = None
         self.shoot_cooldown = 250
-        self.last_shot_time = 0
         self.health_bar = HealthBar(self, NORMAL_TANK_SIZE[0], 2)
 
-        self.initial_vals(x, y, self.current_direction)
+        self.initial_vals(x, y, direction)
+
+    @property
+    def pos(self):
+        """
+        EntityVector: The tank's center position at the current tick, writing through to the
+        store; every write also moves the tank's rect.
+        """
+        return EntityVector(self.store, self.entity, "x", "y", self.sync_rect)
+
+    @pos.setter
+    def pos(self, value):
+        x, y = value
+        self.store.x[self.entity], self.store.y[self.entity] = x, y
+        self.sync_rect()
+
+    @property
+    def prev_pos(self):
+        """
+        EntityVector: The tank's center position at the previous tick, writing through to the store.
+        """
+        return EntityVector(self.store, self.entity, "prev_x", "prev_y")
+
+    @prev_pos.setter
+    def prev_pos(self, value):
+        x, y = value
+        self.store.prev_x[self.entity], self.store.prev_y[self.entity] = x, y
+
+    @property
+    def health(self):
+        """
+        int: The tank's health points.
+        """
+        return int(self.store.health[self.entity])
+
+    @health.setter
+    def health(self, value):
+        self.store.health[self.entity] = value
+
+    @property
+    def cooldown_remaining(self):
+        """
+        float: The time in milliseconds until the tank can shoot again.
+        """
+        return float(self.store.cooldown[self.entity])
+
+    @cooldown_remaining.setter
+    def cooldown_remaining(self, value):
+        self.store.cooldown[self.entity] = value
+
+    @property
+    def current_direction(self):
+        """
+        str: The current direction of the tank.
+        """
+        return DIRECTIONS[self.store.direction[self.entity]]
+
+    @current_direction.setter
+    def current_direction(self, value):
+        self.store.direction[self.entity] = DIRECTION_INDEX[value]
+        self.store.frame[self.entity] = DIRECTION_INDEX[value]
+
+    @property
+    def image(self):
+        """
+        pygame.Surface: The tank image for the current direction.
+        """
+        return self.images[self.current_direction][0]
 
     def get_health(self):
         """
@@ -115,7 +345,8 @@ class Tank(pygame.sprite.Sprite):
         """
         Reset the tank's position, direction, health, and decrement lives.
         """
-        self.rect.center = (self.init_x, self.init_y)
+        self.pos = (self.init_x, self.init_y)
+        self.prev_pos = (self.init_x, self.init_y)
         self.current_direction = self.init_direction
         self.health = 50
         self.lives -= 1
@@ -125,11 +356,10 @@ class Tank(pygame.sprite.Sprite):
         Fire a bullet from the tank's current position and direction.
 
         Args:
-            bullets (list): A list to store the bullets fired by the tank.
+            bullets (list or EntityStore): A list to store the bullets fired by the tank,
+                or an entity store to create bullet entities in.
         """
-        current_time = pygame.time.get_ticks()
-
-        if current_time - self.last_shot_time >= self.shoot_cooldown:
+        if self.cooldown_remaining <= 0:
             if self.current_direction == "up":
                 x, y = self.rect.midtop
             elif self.current_direction == "down":
@@ -139,60 +369,84 @@ class Tank(pygame.sprite.Sprite):
             elif self.current_direction == "right":
                 x, y = self.rect.midright
 
-            bullet = Bullet(x, y, self.current_direction, self.player)
-            bullets.append(bullet)
-
-            self.last_shot_time = current_time
-
-    def move(self, direction):
+            if isinstance(bullets, EntityStore):
+                if "bullet" not in bullets.sprite_ids:
+                    images = load_bullet_images()
+                    bullets.register_sprite("bullet", [images[name][0] for name in DIRECTIONS])
+                size = NORMAL_VERTICAL_BULLET_SIZE if self.current_direction in ("up", "down") else NORMAL_HORIZONTAL_BULLET_SIZE
+                spawn_bullet(bullets, x, y, self.current_direction, self.player, bullets.sprite_ids["bullet"], size)
+            else:
+                bullet = Bullet(x, y, self.current_direction, self.player)
+                bullets.append(bullet)
+
+            self.cooldown_remaining = self.shoot_cooldown
+            self.shots_fired += 1
+            if self.telemetry is not None:
+                self.telemetry.record(self.telemetry.tick, EVENT_SHOT, self.player, x=x, y=y)
+
+    def move(self, direction, dt):
         """
         Move the tank in the specified direction.
         Updates the current_direction and image.
 
         Args:
             direction (str): The direction to move ("up," "down," "left," or "right").
+            dt (float): The length of the simulation tick in seconds.
         """
         self.current_direction = direction
-        self.image, _ = self.images[direction]
-
-        if direction == "up" and self.rect.y > 0:
-            self.rect.y -= self.speed
-        if direction == "down" and self.rect.bottom < SCREEN_HEIGHT:
-            self.rect.y += self.speed
-        if direction == "left" and self.rect.x > 0:
-            self.rect.x -= self.speed
-        if direction == "right" and self.rect.right < SCREEN_WIDTH:
-            self.rect.x += self.speed
+        x, y = self.pos
+        distance = self.speed * dt
+        half_width = self.rect.width / 2
+        half_height = self.rect.height / 2
+
+        if direction == "up":
+            y = max(y - distance, half_height)
+        if direction == "down":
+            y = min(y + distance, SCREEN_HEIGHT - half_height)
+        if direction == "left":
+            x = max(x - distance, half_width)
+        if direction == "right":
+            x = min(x + distance, SCREEN_WIDTH - half_width)
+
+        self.pos = (x, y)
+
+    def sync_rect(self):
+        """
+        Snap the tank's rect to its current position.
+        """
+        x, y = self.pos
+        self.rect.center = (round(x), round(y))
 
-    def event_handler(self, bullets):
+    def event_handler(self, bullets, dt):
         """
         Handle user input for tank movement and shooting.
 
         Args:
             bullets (list): A list to store the bullets fired by the tank.
+            dt (float): The length of the simulation tick in seconds.
         """
         keys = pygame.key.get_pressed()
 
         if self.player == 1:
             if keys[pygame.K_UP]:
-                self.move("up")
+                self.move("up", dt)
             elif keys[pygame.K_DOWN]:
-                self.move("down")
+                self.move("down", dt)
             elif keys[pygame.K_LEFT]:
-                self.move("left")
+                self.move("left", dt)
             elif keys[pygame.K_RIGHT]:
-                self.move("right")
+                self.move("right", dt)
             if keys[pygame.K_KP_ENTER]:
                 self.shoot(bullets)
         if self.player == 2:
             if keys[pygame.K_w]:
-                self.move("up")
+                self.move("up", dt)
             elif keys[pygame.K_s]:
-                self.move("down")
+                self.move("down", dt)
             elif keys[pygame.K_a]:
-                self.move("left")
+                self.move("left", dt)
             elif keys[pygame.K_d]:
-                self.move("right")
+                self.move("right", dt)
             if keys[pygame.K_SPACE]:
                 self.shoot(bullets)
 
@@ -212,8 +466,8 @@ class Tank(pygame.sprite.Sprite):
         Args:
             other_tank (Tank): The other tank involved in the collision.
         """
-        dx = other_tank.rect.centerx - self.rect.centerx
-        dy = other_tank.rect.centery - self.rect.centery
+        dx = other_tank.pos.x - self.pos.x
+        dy = other_tank.pos.y - self.pos.y
 
         length = (dx ** 2 + dy ** 2) ** 0.5
         if length == 0:
@@ -224,32 +478,33 @@ class Tank(pygame.sprite.Sprite):
 
         overlap = (self.rect.width / 2 + other_tank.rect.width / 2) - length
 
-        self.rect.x -= dx * overlap / 2
-        self.rect.y -= dy * overlap / 2
-        other_tank.rect.x += dx * overlap / 2
-        other_tank.rect.y += dy * overlap / 2
+        self.pos -= pygame.math.Vector2(dx, dy) * overlap / 2
+        other_tank.pos += pygame.math.Vector2(dx, dy) * overlap / 2
 
-    def draw(self, image, screen):
+    def draw(self, screen, alpha=1.0):
         """
-        Draw the tank's image on the screen.
+        Draw the tank and its health bar, interpolated between the last two ticks.
 
         Args:
-            image (tuple): A tuple containing the tank image and its rect.
-            screen (pygame.Surface): The Pygame surface on which to draw the image.
+            screen (pygame.Surface): The Pygame surface on which to draw the tank.
+            alpha (float): How far the render time is between the previous and current tick.
         """
-        image_rect = image[1]
-        image = image[0]
-        screen.blit(image, image_rect)
+        rect = self.rect.copy()
+        rect.center = self.prev_pos.lerp(self.pos, alpha)
+        screen.blit(self.image, rect)
+        self.health_bar.rect.midtop = (rect.centerx, rect.top - 10)
+        self.health_bar.draw(screen)
 
-    def update(self, screen, bullets):
+    def update(self, dt, bullets):
         """
-        Update the tank's state, handle user input, and draw it on the screen.
+        Advance the tank's state by one simulation tick.
 
         Args:
-            screen (pygame.Surface): The Pygame surface on which to draw the tank.
+            dt (float): The length of the simulation tick in seconds.
             bullets (list): A list to store the bullets fired by the tank.
         """
-        self.event_handler(bullets)
-        self.draw((self.image, self.rect), screen)
+        self.prev_pos = self.pos
+        if self.cooldown_remaining > 0:
+            self.cooldown_remaining = max(self.cooldown_remaining - dt * 1000, 0)
+        self.event_handler(bullets, dt)
         self.health_bar.update()
-        self.health_bar.draw(screen)
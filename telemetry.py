@@ -0,0 +1,377 @@
+import collections
+import glob
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from constants import (
+    TELEMETRY_DIR, TELEMETRY_FORMAT, TELEMETRY_BUFFER, TELEMETRY_FLUSH_INTERVAL, TELEMETRY_MAX_FILE_BYTES,
+)
+
+TELEMETRY_MAGIC = b"TNKTLM1\n"
+
+# event types
+EVENT_SHOT = 1
+EVENT_CANCEL = 2
+EVENT_HIT = 3
+EVENT_DEATH = 4
+EVENT_ROUND_END = 5
+EVENT_DROPPED = 6
+EVENT_NAMES = {
+    EVENT_SHOT: "shot",
+    EVENT_CANCEL: "cancel",
+    EVENT_HIT: "hit",
+    EVENT_DEATH: "death",
+    EVENT_ROUND_END: "round_end",
+    EVENT_DROPPED: "dropped",
+}
+EVENT_TYPES = {name: event for event, name in EVENT_NAMES.items()}
+
+# player is who acted and target who it was done to:
+#   shot      player fired a bullet spawned at (x, y)
+#   cancel    player's bullet was cancelled by another bullet at (x, y)
+#   hit       player hit target, value is target's health afterwards
+#   death     player was killed by target (0 if unknown), value is player's lives left
+#   round_end player won against target
+#   dropped   value events meant for this file were dropped because the ring was full;
+#             written last in a file, player and target are 0
+EVENT_DTYPE = np.dtype([
+    ("tick", "<u4"), ("event", "u1"), ("player", "u1"), ("target", "u1"), ("pad", "u1"),
+    ("value", "<i4"), ("x", "<f4"), ("y", "<f4"),
+])
+
+class TelemetryStream():
+    """
+    A class buffering match events and writing them to disk on a background thread.
+
+    Events are stored in a preallocated ring of EVENT_DTYPE records; the game
+    thread only writes one record per event. A writer thread flushes the
+    pending records in bulk every flush interval, or sooner when the ring is
+    half full, so the frame loop never touches a file. Events arriving while
+    the ring is full are dropped and counted, and every file that lost
+    events ends with an EVENT_DROPPED record holding the count.
+
+    Files are rotated at the end of every match and when they grow past
+    max_bytes. A binary file is TELEMETRY_MAGIC followed by packed
+    EVENT_DTYPE records; a JSONL file has one event object per line.
+
+    Attributes:
+        ring (numpy.ndarray): The preallocated event records.
+        head (int): The number of events recorded since start.
+        tail (int): The number of events written since start.
+        dropped (int): The number of events dropped because the ring was full.
+        tick (int): The simulation tick being recorded, for callers that do not track it.
+        recording (bool): Whether events are currently recorded.
+        paths (list): The files written so far.
+
+    Methods:
+        start(directory):
+            Start recording events and the writer thread.
+
+        record(tick, event, player, target, value, x, y):
+            Add an event to the ring.
+
+        rotate():
+            Start a new file after the events recorded so far.
+
+        stop():
+            Write the remaining events and stop the writer thread.
+    """
+
+    def __init__(self, capacity=TELEMETRY_BUFFER, file_format=TELEMETRY_FORMAT,
+                 flush_interval=TELEMETRY_FLUSH_INTERVAL, max_bytes=TELEMETRY_MAX_FILE_BYTES):
+        """
+        Initialize a TelemetryStream object.
+
+        Args:
+            capacity (int): The number of events the ring holds.
+            file_format (str): "binary" for packed records, "jsonl" for JSON lines.
+            flush_interval (float): The seconds between flushes.
+            max_bytes (int): The size after which a file is rotated.
+        """
+        self.ring = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.capacity = capacity
+        self.format = file_format
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+        self.tick = 0
+        # (position, EVENT_DROPPED or None for a rotation) in the order they happened
+        self.markers = collections.deque()
+        self.file_dropped = 0
+        self.wake = threading.Event()
+        self.thread = None
+        self.file = None
+        self.recording = False
+        self.stopping = False
+        self.directory = None
+        self.session = None
+        self.sequence = 0
+        self.paths = []
+
+    def start(self, directory=TELEMETRY_DIR):
+        """
+        Start recording events and the writer thread.
+
+        Args:
+            directory (str): The directory to write event files to.
+        """
+        if self.recording:
+            return
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.session = time.strftime("%Y%m%d-%H%M%S")
+        self.stopping = False
+        self.thread = threading.Thread(target=self.write_events, name="TelemetryStream", daemon=True)
+        self.thread.start()
+        self.recording = True
+
+    def record(self, tick, event, player, target=0, value=0, x=0.0, y=0.0):
+        """
+        Add an event to the ring.
+
+        Args:
+            tick (int): The simulation tick the event happened on.
+            event (int): The event type (EVENT_SHOT, EVENT_HIT, ...).
+            player (int): The player who acted.
+            target (int): The player it was done to, or 0.
+            value (int): An event-specific value (see EVENT_DTYPE).
+            x (float): The X-coordinate of the event.
+            y (float): The Y-coordinate of the event.
+        """
+        if not self.recording:
+            return
+        head = self.head
+        if head - self.tail >= self.capacity:
+            self.dropped += 1
+            self.markers.append((head, EVENT_DROPPED))
+            return
+        self.ring[head % self.capacity] = (tick, event, player, target, 0, value, x, y)
+        self.head = head + 1
+        if head + 1 - self.tail >= self.capacity // 2:
+            self.wake.set()
+
+    def rotate(self):
+        """
+        Start a new file after the events recorded so far.
+        """
+        if self.recording:
+            self.markers.append((self.head, None))
+            self.wake.set()
+
+    def write_events(self):
+        """
+        Flush pending events until stop() is called; runs on the writer thread.
+        """
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            stopping = self.stopping
+            self.flush()
+            if stopping:
+                self.close_file()
+                return
+
+    def flush(self):
+        """
+        Write every event recorded so far, rotating files and counting drops where they happened.
+        """
+        head = self.head
+        while self.markers and self.markers[0][0] <= head:
+            position, marker = self.markers.popleft()
+            self.write_events_until(position)
+            if marker == EVENT_DROPPED:
+                self.file_dropped += 1
+            else:
+                self.close_file()
+        self.write_events_until(head)
+
+    def write_events_until(self, end):
+        """
+        Write the recorded events up to a position in the ring.
+
+        Args:
+            end (int): The number of events recorded since start to write up to.
+        """
+        if self.tail >= end:
+            return
+        start = self.tail % self.capacity
+        count = end - self.tail
+        first = min(count, self.capacity - start)
+        self.write_block(self.ring[start:start + first])
+        if first < count:
+            self.write_block(self.ring[:count - first])
+        self.tail = end
+
+    def write_block(self, block):
+        """
+        Append a block of event records to the current file, opening one if needed.
+
+        Args:
+            block (numpy.ndarray): Consecutive EVENT_DTYPE records.
+        """
+        if len(block) == 0:
+            return
+        if self.file is None:
+            self.sequence += 1
+            extension = "jsonl" if self.format == "jsonl" else "bin"
+            path = os.path.join(self.directory, f"match-{self.session}-{self.sequence:05d}.{extension}")
+            self.file = open(path, "w" if self.format == "jsonl" else "wb")
+            if self.format != "jsonl":
+                self.file.write(TELEMETRY_MAGIC)
+            self.paths.append(path)
+
+        if self.format == "jsonl":
+            lines = []
+            for tick, event, player, target, _, value, x, y in block.tolist():
+                lines.append(json.dumps({
+                    "tick": tick, "event": EVENT_NAMES[event], "player": player, "target": target,
+                    "value": value, "x": round(x, 1), "y": round(y, 1),
+                }, separators=(",", ":")))
+            self.file.write("\n".join(lines) + "\n")
+        else:
+            self.file.write(block.tobytes())
+
+        if self.file.tell() >= self.max_bytes:
+            self.close_file()
+
+    def close_file(self):
+        """
+        Close the current file, ending it with the count of events it lost; the next event opens a new one.
+        """
+        if self.file_dropped:
+            dropped = np.zeros(1, dtype=EVENT_DTYPE)
+            dropped["tick"] = self.tick
+            dropped["event"] = EVENT_DROPPED
+            dropped["value"] = self.file_dropped
+            self.file_dropped = 0
+            self.write_block(dropped)
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def stop(self):
+        """
+        Write the remaining events and stop the writer thread.
+        """
+        if not self.recording:
+            return
+        self.recording = False
+        self.stopping = True
+        self.wake.set()
+        self.thread.join()
+        self.thread = None
+
+def read_events(path):
+    """
+    Read the events of a binary or JSONL telemetry file.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        numpy.ndarray: The events as EVENT_DTYPE records.
+    """
+    if path.endswith(".jsonl"):
+        rows = []
+        with open(path) as events_file:
+            for line in events_file:
+                if line.strip():
+                    event = json.loads(line)
+                    rows.append((
+                        event["tick"], EVENT_TYPES[event["event"]], event["player"], event["target"], 0,
+                        event["value"], event["x"], event["y"],
+                    ))
+        return np.array(rows, dtype=EVENT_DTYPE)
+
+    with open(path, "rb") as events_file:
+        if events_file.read(len(TELEMETRY_MAGIC)) != TELEMETRY_MAGIC:
+            raise ValueError(f"Not a telemetry file: {path}")
+        data = events_file.read()
+    # a file cut short by a crash ends in a partial record
+    usable = len(data) - len(data) % EVENT_DTYPE.itemsize
+    return np.frombuffer(data[:usable], dtype=EVENT_DTYPE)
+
+def aggregate(paths):
+    """
+    Compute accuracy and kill/death statistics per player over telemetry files.
+
+    Args:
+        paths (iterable): The telemetry files to read.
+
+    Returns:
+        dict: Per-player dicts of "shots", "hits", "cancels", "kills", "deaths",
+        "rounds_won", "accuracy" and "kill_death_ratio", plus "files" and "events" totals.
+        Hits without a recorded shot, from dropped events or files that were
+        not read, are counted in "unmatched_hits" and accuracy is capped at 1.
+        The events the stream dropped are totalled in "dropped", and the files
+        that lost any are listed in "lossy_files".
+    """
+    counters = ("shots", "hits", "cancels", "kills", "deaths", "rounds_won")
+    # (counter, event type, field holding the player it is counted for)
+    sources = (
+        ("shots", EVENT_SHOT, "player"),
+        ("hits", EVENT_HIT, "player"),
+        ("cancels", EVENT_CANCEL, "player"),
+        ("kills", EVENT_DEATH, "target"),
+        ("deaths", EVENT_DEATH, "player"),
+        ("rounds_won", EVENT_ROUND_END, "player"),
+    )
+    totals = np.zeros((len(counters), 256), dtype=np.int64)
+    files = 0
+    events = 0
+    dropped = 0
+    lossy_files = []
+    for path in paths:
+        records = read_events(path)
+        files += 1
+        events += len(records)
+        file_dropped = int(records["value"][records["event"] == EVENT_DROPPED].sum())
+        if file_dropped:
+            dropped += file_dropped
+            lossy_files.append(path)
+        for row, (_, event, field) in enumerate(sources):
+            players = records[field][records["event"] == event]
+            totals[row] += np.bincount(players, minlength=256)
+
+    stats = {"files": files, "events": events, "dropped": dropped, "lossy_files": lossy_files, "players": {}}
+    for player in np.flatnonzero(totals.any(axis=0)).tolist():
+        if player == 0:
+            continue
+        player_stats = {name: int(totals[row, player]) for row, name in enumerate(counters)}
+        player_stats["unmatched_hits"] = max(player_stats["hits"] - player_stats["shots"], 0)
+        player_stats["accuracy"] = min(player_stats["hits"] / max(player_stats["shots"], 1), 1.0)
+        player_stats["kill_death_ratio"] = player_stats["kills"] / max(player_stats["deaths"], 1)
+        stats["players"][player] = player_stats
+    return stats
+
+if __name__ == "__main__":
+    # Aggregate every telemetry file in the given directories (TELEMETRY_DIR by default).
+    directories = sys.argv[1:] or [TELEMETRY_DIR]
+    paths = []
+    for directory in directories:
+        paths += sorted(glob.glob(os.path.join(directory, "*.bin")) + glob.glob(os.path.join(directory, "*.jsonl")))
+
+    start = time.perf_counter()
+    result = aggregate(paths)
+    elapsed = time.perf_counter() - start
+    print(f"{result['files']} files, {result['events']} events in {elapsed * 1000:.1f} ms")
+    if result["dropped"]:
+        print(f"{result['dropped']} events were dropped while recording, from {len(result['lossy_files'])} files:")
+        for path in result["lossy_files"]:
+            print(f"    {path}")
+    for player, player_stats in sorted(result["players"].items()):
+        print(
+            f"player {player}: {player_stats['shots']} shots, {player_stats['hits']} hits "
+            f"({player_stats['accuracy']:.1%} accuracy), {player_stats['cancels']} cancelled, "
+            f"{player_stats['kills']} kills, {player_stats['deaths']} deaths "
+            f"(K/D {player_stats['kill_death_ratio']:.2f}), {player_stats['rounds_won']} rounds won"
+        )
+        if player_stats["unmatched_hits"]:
+            print(f"    {player_stats['unmatched_hits']} hits have no recorded shot; accuracy is capped at 100%")